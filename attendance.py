@@ -0,0 +1,731 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""考勤数据与计分逻辑（不依赖 tkinter，可供 GUI 与命令行共用）"""
+import copy
+import base64
+from pathlib import Path
+from datetime import datetime, date, timedelta
+from collections import deque
+from contextlib import contextmanager
+import storage
+import settings_loader
+# yaml、report、fastscore 以及 sqlite/eventlog 后端在用到时才导入，以加快启动
+
+def _run_awards(n):
+    """单段连续出勤 n 天对应的 (3天奖励次数, 7天奖励次数)
+
+    与逐段扣减7天的算法等价：每满7天计一次7天奖励，余数达到3天再计一次3天奖励。
+    """
+    return (1 if n % 7 >= 3 else 0), n // 7
+
+def _pack_history(history):
+    """把出勤布尔列表压缩为位图（第 i 天对应第 i 位，低位在前），返回 base64 字符串"""
+    bits = 0
+    for i, arrived in enumerate(history):
+        if arrived:
+            bits |= 1 << i
+    raw = bits.to_bytes((len(history) + 7) // 8, 'little')
+    return base64.b64encode(raw).decode('ascii')
+
+def _unpack_history(encoded, length):
+    """_pack_history 的逆操作，length 为原列表长度"""
+    raw = base64.b64decode(encoded)
+    length = min(int(length), len(raw) * 8)
+    bits = int.from_bytes(raw, 'little')
+    return [bool(bits >> i & 1) for i in range(length)]
+
+class ContinuousScoring:
+    """连续考勤评分系统，替代生成器的可序列化类"""
+    
+    def __init__(self, max_days=7):
+        self.scoring = [0]  # 连续出勤天数记录
+        self.history = []   # 历史出勤记录
+        self.max_days = max_days
+        self.current_day = 0
+        self._rebuild_counters()
+    
+    def _rebuild_counters(self):
+        """根据 history 重建窗口内的连续段与奖励计数（仅在加载/重置时调用）"""
+        # _runs 与 calculate_scores 中重建的 scoring 一致：以缺勤为分隔的各段连续天数
+        self._runs = deque([0])
+        for arrived in self.history:
+            if arrived:
+                self._runs[-1] += 1
+            else:
+                self._runs.append(0)
+        self._3_day, self._7_day = 0, 0
+        for n in self._runs:
+            self._apply_run(n, 1)
+    
+    def _apply_run(self, n, sign):
+        """把长度为 n 的连续段的奖励加入(sign=1)或移出(sign=-1)计数"""
+        _3, _7 = _run_awards(n)
+        self._3_day += sign * _3
+        self._7_day += sign * _7
+    
+    def _resize_run(self, index, delta):
+        """将 _runs[index] 增减 delta 天，并同步奖励计数"""
+        n = self._runs[index]
+        self._apply_run(n, -1)
+        self._runs[index] = n + delta
+        self._apply_run(n + delta, 1)
+    
+    def record_attendance(self, today_arrived):
+        """记录当天考勤"""
+        if today_arrived:
+            self.scoring[-1] += 1
+            self._resize_run(-1, 1)
+        else:
+            self.scoring.append(0)
+            self._runs.append(0)
+        
+        self.history.append(today_arrived)
+        self.current_day += 1
+        
+        # 只保留最近max_days*2天的记录，避免内存过度增长
+        while len(self.history) > self.max_days * 2:
+            if self.history.pop(0):
+                # 最早的一天出勤：第一段缩短一天
+                self._resize_run(0, -1)
+            else:
+                # 最早的一天缺勤：第一段必为0天，与下一段合并
+                self._runs.popleft()
+    
+    def calculate_scores(self):
+        """计算3天和7天连续出勤分数（增量维护，O(1)）"""
+        return self._3_day, self._7_day
+    
+    def get_current_streak(self):
+        """获取当前连续出勤天数"""
+        return self.scoring[-1] if self.scoring else 0
+    
+    def get_total_attendance(self):
+        """获取总出勤天数"""
+        return sum(self.history)
+    
+    def get_attendance_rate(self):
+        """获取出勤率"""
+        if len(self.history) == 0:
+            return 0
+        return sum(self.history) / len(self.history)
+    
+    def reset_data(self):
+        """重置数据，开始新的一周"""
+        self.scoring = [0]
+        self.history = []
+        self.current_day = 0
+        self._rebuild_counters()
+    
+    def to_dict(self):
+        """转换为可序列化的字典（history 以位图形式保存）"""
+        return {
+            'scoring': self.scoring,
+            'history_bits': _pack_history(self.history),
+            'history_len': len(self.history),
+            'max_days': self.max_days,
+            'current_day': self.current_day
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """从字典恢复对象（包含简单校验与容错）"""
+        # 解析并校验 max_days
+        max_days_raw = data.get('max_days', 7)
+        try:
+            max_days = int(max_days_raw)
+            if max_days < 1:
+                max_days = 7
+        except Exception:
+            max_days = 7
+
+        obj = cls(max_days)
+        # 确保 scoring 为整数列表，至少包含一个元素
+        raw_scoring = data.get('scoring', [0]) or [0]
+        try:
+            obj.scoring = [int(x) for x in raw_scoring]
+        except Exception:
+            obj.scoring = [0]
+
+        # 确保 history 为布尔列表；新格式为位图，旧格式为 true/false 列表
+        try:
+            if 'history_bits' in data:
+                obj.history = _unpack_history(data['history_bits'], data.get('history_len', 0))
+            else:
+                raw_history = data.get('history', []) or []
+                obj.history = [bool(x) for x in raw_history]
+        except Exception:
+            obj.history = []
+
+        # current_day 尽量与 history 长度保持一致性
+        try:
+            obj.current_day = int(data.get('current_day', len(obj.history)))
+        except Exception:
+            obj.current_day = len(obj.history)
+
+        if not obj.scoring:
+            obj.scoring = [0]
+
+        obj._rebuild_counters()
+        return obj
+
+class AttendanceSystem:
+    def __init__(self, root=None, read_only=False):
+        # root 为项目目录（包含 bacon/、eggs/、reports/），默认为当前目录
+        # read_only 时只读取（导出名单等）：不创建目录、设置文件与数据文件，不迁移数据
+        self.cwd = Path(root) if root is not None else Path.cwd()
+        self.read_only = read_only
+        if not read_only:
+            self.setup_directories()
+        self._settings_stamp = self._settings_file_stamp()
+        self.setting = self.load_settings()
+        self._apply_settings()
+        # 会话数据缓存: session -> [students, 文件mtime]，以及尚未写盘的 session
+        self._cache = {}
+        self._dirty = set()
+        self._batch_depth = 0
+        # eventlog 后端：在事务中达到压缩阈值时，推迟到事务提交之后再压缩
+        self._compact_pending = False
+        # 断点（暂存）数据缓存: [全部断点数据, 文件mtime]
+        self._breakpoints = None
+        # 存储后端：json（默认，eggs/{session}_data.json）、sqlite（eggs/attendance.db）
+        # 或 eventlog（eggs/{session}_snapshot.json + eggs/events.log）
+        self.db = None
+        self.log = None
+        backend = self.settings.backend
+        if backend == 'sqlite':
+            from sqlite_store import AttendanceDB
+            if not read_only:
+                self.db = AttendanceDB(self.cwd/'eggs/attendance.db')
+                self.migrate_to_sqlite()
+            elif (self.cwd/'eggs/attendance.db').exists():
+                self.db = AttendanceDB(self.cwd/'eggs/attendance.db', read_only=True)
+            # 只读且数据库尚未建立时，沿用旧的 JSON 数据文件
+        elif backend == 'eventlog':
+            from eventlog import EventLog
+            self.log = EventLog(self.cwd/'eggs/events.log', read_only=read_only)
+    
+    def _apply_settings(self):
+        """校验 self.setting 并计算字体、备份份数等派生设置（加载与热更新时调用）"""
+        # self.setting 为原始字典，self.settings 为校验后的设置对象
+        self.settings = settings_loader.Settings(self.setting)
+        self.font_chinese = self.settings.font
+        # 数据文件保留的滚动备份份数（storage.backups，0 为不备份）
+        self.backups = self.settings.backups
+        # eventlog 后端：日志累计到该条数时自动压缩进快照
+        self.compact_every = self.settings.compact_every
+    
+    def _settings_file_stamp(self):
+        try:
+            stat = (self.cwd/'bacon/Setting.yml').stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
+    def reload_settings(self):
+        """设置文件有变化时重新加载，返回设置是否改变
+        
+        只比较文件的 mtime 与大小，未变化时不读文件，适合定时轮询。
+        storage.backend 的切换需要重启程序才会生效。
+        """
+        stamp = self._settings_file_stamp()
+        if stamp is None or stamp == self._settings_stamp:
+            return False
+        setting = self.load_settings()
+        if not isinstance(setting.get('namelist'), list) or not setting['namelist']:
+            # 空文件或没有名单：多半是其他程序正在写入，保留当前设置，下次轮询再读
+            return False
+        self._settings_stamp = stamp
+        if setting == self.setting:
+            return False
+        self.setting = setting
+        self._apply_settings()
+        return True
+    
+    def setup_directories(self):
+        """创建必要的目录"""
+        if not (self.cwd/'eggs').exists():
+            (self.cwd/'eggs').mkdir()
+        if not (self.cwd/'bacon').exists():
+            (self.cwd/'bacon').mkdir()
+        if not (self.cwd/'reports').exists():
+            (self.cwd/'reports').mkdir()
+    
+    def load_settings(self):
+        """加载或创建设置文件"""
+        settings_file = self.cwd/'bacon/Setting.yml'
+    
+        if not settings_file.exists():
+            # 创建默认设置
+            default_settings = copy.deepcopy(settings_loader.DEFAULTS)
+            if self.read_only:
+                return default_settings
+            # 将默认设置写入文件
+            import yaml
+            storage.write_text(settings_file, yaml.dump(default_settings, allow_unicode=True))
+            return default_settings
+        else:
+            return settings_loader.load(settings_file)
+    
+    def _data_file(self, session):
+        """session 数据所在的文件，用于判断缓存是否过期"""
+        if self.db is not None:
+            return self.db.path
+        if self.log is not None:
+            return self.log.path
+        return self.cwd/f'eggs/{session}_data.json'
+    
+    def _read_session(self, session):
+        """从存储后端读取 session 数据，不存在时返回 None"""
+        if self.db is not None:
+            if not self.db.has_session(session):
+                return None
+            # 在基准状态上重放之后记录的各天
+            students = {}
+            days = self.db.days_after_base(session)
+            for name, base, _ in self.db.members(session):
+                student = ContinuousScoring.from_dict(base)
+                for arrived in days.get(name, ()):
+                    student.record_attendance(arrived)
+                students[name] = student
+            return students
+        
+        if self.log is not None:
+            return self._read_snapshot(session)
+        
+        try:
+            data = storage.read_json(self._data_file(session), self.backups)
+        except FileNotFoundError:
+            return None
+        
+        # 从字典恢复ContinuousScoring对象
+        students = {}
+        for name, student_data in data.items():
+            students[name] = ContinuousScoring.from_dict(student_data)
+        return students
+    
+    def load_student_data(self, session, create=True):
+        """加载学生数据（命中缓存时不重新解析文件）
+        
+        数据不存在时按名单新建并保存；create 为 False（或只读）时只返回 {}，不写任何文件。
+        """
+        entry = self._cache.get(session)
+        
+        # 未写盘的修改以内存为准
+        if entry is not None and session in self._dirty:
+            return entry[0]
+        
+        try:
+            mtime = self._data_file(session).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if entry is not None and mtime is not None and entry[1] == mtime:
+            return entry[0]
+        
+        students = self._read_session(session)
+        if students is not None:
+            self._cache[session] = [students, mtime]
+            return students
+        elif not create or self.read_only:
+            return {}
+        else:
+            # 创建新的学生数据，使用配置中的 max_days（若存在）
+            students = {}
+            for name in self.settings.namelist:
+                students[name] = ContinuousScoring(max_days=self.settings.max_days)
+            
+            self.save_student_data(session, students)
+            return students
+    
+    def _check_writable(self):
+        if self.read_only:
+            raise RuntimeError("只读模式下不能修改考勤数据")
+    
+    def save_student_data(self, session, students):
+        """保存学生数据（批量模式下只标记为待写入，由 flush 统一写盘）"""
+        self._check_writable()
+        self._cache[session] = [students, None]
+        self._dirty.add(session)
+        if self._batch_depth == 0:
+            self.flush(session)
+    
+    def flush(self, session=None):
+        """把缓存中待写入的数据写回文件；session 为 None 时写回全部"""
+        sessions = [session] if session is not None else sorted(self._dirty)
+        for session in sessions:
+            if session not in self._dirty:
+                continue
+            students = self._cache[session][0]
+            
+            if self.db is not None:
+                # SQLite 后端：以当前状态作为新的基准状态
+                self.db.set_bases(session, [(name, student.to_dict()) for name, student in students.items()])
+                self._dirty.discard(session)
+                self._data_written()
+                continue
+            
+            if self.log is not None:
+                # 事件日志后端：写入快照，并记下快照已包含到日志的哪一条
+                snapshot = {'seq': self.log.seq,
+                            'students': {name: student.to_dict() for name, student in students.items()}}
+                storage.write_json(self.cwd/f'eggs/{session}_snapshot.json', snapshot,
+                                   backups=self.backups, separators=(',', ':'))
+                self._dirty.discard(session)
+                continue
+            
+            # 转换为可序列化的字典
+            data = {}
+            for name, student in students.items():
+                data[name] = student.to_dict()
+            
+            # 数据文件只供程序读写，使用紧凑格式以减小体积、加快解析
+            storage.write_json(self._data_file(session), data, backups=self.backups, separators=(',', ':'))
+            
+            self._dirty.discard(session)
+            self._cache[session][1] = None
+        if not storage.in_transaction():
+            self._refresh_mtimes()
+    
+    def _refresh_mtimes(self):
+        """数据落盘后记录文件 mtime，供下次加载判断缓存是否有效"""
+        if self._breakpoints is not None and self._breakpoints[1] is None:
+            self._breakpoints[1] = self._breakpoint_mtime()
+        for session, entry in self._cache.items():
+            if entry[1] is None and session not in self._dirty:
+                try:
+                    entry[1] = self._data_file(session).stat().st_mtime_ns
+                except FileNotFoundError:
+                    pass
+    
+    def _data_written(self):
+        """本进程写入数据库/日志后，所有 session 的缓存仍然有效，只需更新 mtime"""
+        for entry in self._cache.values():
+            entry[1] = None
+        self._refresh_mtimes()
+    
+    @contextmanager
+    def batch(self):
+        """批量修改：期间的 save_student_data 只更新缓存，正常退出时统一落盘一次
+        
+        出错时不写入任何数据，并丢弃缓存中尚未落盘的修改（下次从文件重新加载）。
+        """
+        self._batch_depth += 1
+        try:
+            with storage.transaction():
+                try:
+                    yield self
+                finally:
+                    self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+        except BaseException:
+            self._discard_unsaved()
+            raise
+        finally:
+            if not storage.in_transaction():
+                self._refresh_mtimes()
+        if self._compact_pending and not storage.in_transaction():
+            self.compact_log()
+    
+    def _discard_unsaved(self):
+        """丢弃缓存中未落盘的数据（包括事务中已暂存、但随事务一起被丢弃的写入）"""
+        for session, entry in list(self._cache.items()):
+            if session in self._dirty or entry[1] is None:
+                del self._cache[session]
+        self._dirty.clear()
+        if self._breakpoints is not None and self._breakpoints[1] is None:
+            self._breakpoints = None
+    
+    def record_attendance(self, session, present_students, date=None):
+        """记录考勤；date 为 YYYY-MM-DD（补录时使用），默认今天，仅 sqlite/eventlog 后端会保存"""
+        return self.record_many(session, [present_students], start_date=date)
+    
+    def record_many(self, session, days, start_date=None):
+        """一次记录连续多天的考勤，数据只加载、保存一次
+        
+        days 为每天的出勤名单序列；start_date 为第一天的日期（YYYY-MM-DD 或 date），
+        默认使最后一天为今天。返回记录完成后每个成员的 (3天, 7天) 奖励次数。
+        """
+        self._check_writable()
+        days = list(days)
+        if start_date is None:
+            start = datetime.now().date() - timedelta(days=len(days) - 1)
+        elif isinstance(start_date, str):
+            start = date.fromisoformat(start_date)
+        else:
+            start = start_date
+        dates = [(start + timedelta(days=offset)).isoformat() for offset in range(len(days))]
+        
+        students = self.load_student_data(session)
+        
+        # 名单中新增（例如设置热更新后）而数据中还没有的成员：先以空记录加入并保存，
+        # 否则数据库与事件日志重放时会丢掉他们的记录
+        added = [name for name in self.settings.namelist if name not in students]
+        if added:
+            for name in added:
+                students[name] = ContinuousScoring(max_days=self.settings.max_days)
+            self.save_student_data(session, students)
+        
+        # 每个成员的出勤位图：第 d 天出勤则第 d 位为 1
+        masks = dict.fromkeys(students, 0)
+        for offset, present_students in enumerate(days):
+            bit = 1 << offset
+            for name in set(present_students):
+                if name in masks:
+                    masks[name] |= bit
+        
+        # 更新每个学生的考勤记录
+        for name, student in students.items():
+            mask = masks[name]
+            for offset in range(len(days)):
+                student.record_attendance(bool(mask >> offset & 1))
+        
+        # 保存更新后的数据：SQLite 后端只追加这几天的行，事件日志只追加事件，JSON 后端重写整个文件
+        if self.db is not None:
+            self.db.record_days(session, [
+                (day, [(name, bool(mask >> offset & 1)) for name, mask in masks.items()])
+                for offset, day in enumerate(dates)])
+            self._data_written()
+        elif self.log is not None:
+            self.log.append([
+                {'date': day, 'session': session,
+                 'present': [name for name, mask in masks.items() if mask >> offset & 1]}
+                for offset, day in enumerate(dates)])
+            self._data_written()
+            if self.log.count >= self.compact_every:
+                if storage.in_transaction():
+                    # 快照要等外层事务提交后才落盘，此时截断日志会先于快照生效
+                    self._compact_pending = True
+                else:
+                    self.compact_log()
+        else:
+            self.save_student_data(session, students)
+        
+        # 计算并显示分数
+        scores = {}
+        for name, student in students.items():
+            scores[name] = student.calculate_scores()
+        
+        return scores
+    
+    def migrate_to_sqlite(self):
+        """把已有的 JSON 数据文件一次性导入 SQLite（数据库中已有该 session 时跳过）"""
+        for session in ("morning", "afternoon"):
+            data_file = self.cwd/f'eggs/{session}_data.json'
+            if self.db.has_session(session):
+                continue
+            try:
+                data = storage.read_json(data_file, self.backups)
+            except FileNotFoundError:
+                continue
+            members = []
+            for name, student_data in data.items():
+                student = ContinuousScoring.from_dict(student_data)
+                members.append((name, student.to_dict(), student.history))
+            self.db.import_session(session, members)
+    
+    def _read_snapshot(self, session):
+        """事件日志后端：读取快照并重放其后的事件；没有快照时沿用旧的 JSON 数据文件"""
+        try:
+            snapshot = storage.read_json(self.cwd/f'eggs/{session}_snapshot.json', self.backups)
+        except FileNotFoundError:
+            try:
+                snapshot = {'seq': 0, 'students': storage.read_json(self.cwd/f'eggs/{session}_data.json', self.backups)}
+            except FileNotFoundError:
+                return None
+        
+        students = {}
+        for name, student_data in snapshot['students'].items():
+            students[name] = ContinuousScoring.from_dict(student_data)
+        for event in self.log.events(after=snapshot['seq'], session=session):
+            present = set(event['present'])
+            for name, student in students.items():
+                student.record_attendance(name in present)
+        return students
+    
+    def compact_log(self):
+        """把事件日志折叠进各 session 的快照，再把已折叠的事件移入归档日志"""
+        self._compact_pending = False
+        if self.log is None:
+            return
+        if storage.in_transaction():
+            raise RuntimeError("不能在事务中压缩事件日志")
+        sessions = {event['session'] for event in self.log.events()}
+        with self.batch():
+            for session in sorted(sessions):
+                self.save_student_data(session, self.load_student_data(session))
+        # 快照已落盘，之后才能截断日志
+        self.log.compact(self.log.seq)
+        self._data_written()
+    
+    def count_present(self, session, start_date=None, end_date=None):
+        """按日期范围统计每个成员的出勤天数（仅 SQLite 后端，日期为 YYYY-MM-DD）"""
+        if self.db is None:
+            raise RuntimeError("按日期查询需要在设置中启用 storage.backend: sqlite")
+        return self.db.count_present(session, start_date, end_date)
+    
+    def reset_all_data(self):
+        """重置所有学生的数据，开始新的一周"""
+        sessions = ["morning", "afternoon"]
+        with self.batch():
+            for session in sessions:
+                students = self.load_student_data(session)
+                for student in students.values():
+                    student.reset_data()
+                self.save_student_data(session, students)
+    
+    def _session_awards(self, students, names, vectorized=False):
+        """按 names 顺序给出每人的 (3天, 7天) 奖励次数；vectorized 时用 numpy 从 history 批量计算"""
+        empty = ContinuousScoring()
+        if not vectorized:
+            return (students.get(name, empty).calculate_scores() for name in names)
+        import fastscore
+        threes, sevens = fastscore.score_histories(students.get(name, empty).history for name in names)
+        return zip(threes.tolist(), sevens.tolist())
+    
+    def iter_report_rows(self, vectorized=False):
+        """逐个生成每位成员的报告行，不在内存中保存整张表"""
+        names = self.settings.namelist
+        morning_awards = self._session_awards(self.load_student_data("morning"), names, vectorized)
+        afternoon_awards = self._session_awards(self.load_student_data("afternoon"), names, vectorized)
+        
+        for index, (name, morning, afternoon) in enumerate(zip(names, morning_awards, afternoon_awards)):
+            # 计算各部分分数
+            morning_total = self.settings.score(morning)
+            afternoon_total = self.settings.score(afternoon)
+            
+            yield {
+                'index': index,
+                'name': name,
+                'morning_total': morning_total,
+                'afternoon_total': afternoon_total,
+                'total_score': morning_total + afternoon_total
+            }
+    
+    def iter_member_stats(self, names=None):
+        """逐个生成成员当前的连续出勤天数与本阶段总分；names 默认为设置中的名单，不在数据中的记为 0"""
+        names = self.settings.namelist if names is None else names
+        # 只读取：尚未建立的 session 视为空，不创建数据文件
+        sessions = [(session, self.load_student_data(session, create=False)) for session in ("morning", "afternoon")]
+        
+        for name in names:
+            row = {'name': name}
+            total = 0
+            for session, students in sessions:
+                student = students.get(name)
+                if student is None:
+                    row[f'{session}_streak'] = 0
+                    continue
+                row[f'{session}_streak'] = student.get_current_streak()
+                total += self.settings.score(student.calculate_scores())
+            row['total_score'] = total
+            yield row
+    
+    def verify_scores(self):
+        """用 numpy 批量计分核对每个人增量维护的奖励次数，返回不一致的 [(session, 名字, 增量结果, 批量结果)]"""
+        mismatches = []
+        for session in ("morning", "afternoon"):
+            students = self.load_student_data(session)
+            names = list(students)
+            vectorized = self._session_awards(students, names, vectorized=True)
+            for name, awards in zip(names, vectorized):
+                scalar = students[name].calculate_scores()
+                if tuple(scalar) != tuple(awards):
+                    mismatches.append((session, name, scalar, tuple(awards)))
+        return mismatches
+    
+    def build_score_table(self, vectorized=False):
+        """计分一次，得到供所有导出格式共用的分数表；vectorized 见 iter_report_rows"""
+        students = self.settings.namelist
+        morning_students = self.load_student_data("morning")
+        
+        # 获取阶段时长（以名单最后一人的上午记录为准）
+        max_day = 7  # 默认值
+        if students and students[-1] in morning_students:
+            max_day = len(morning_students[students[-1]].history)
+        
+        import report
+        return report.ScoreTable(list(self.iter_report_rows(vectorized)), self.settings.points,
+                                 max_day, datetime.now())
+    
+    def export_reports(self, formats=None, table=None):
+        """把分数表导出为 formats 中的各格式（默认取 report.formats 设置），返回 {格式: 文件路径}"""
+        import report
+        if formats is None:
+            formats = self.settings.report_formats
+        # 先校验格式，再计分和写文件
+        formats = report.check_formats(formats)
+        if table is None:
+            table = self.build_score_table()
+        
+        stem = f'考勤汇总_{table.timestamp.strftime("%Y%m%d_%H%M%S")}'
+        return report.write_reports(table, self.cwd / 'reports', stem, formats,
+                                    self.settings.md_sort, self.settings.md_top)
+    
+    def generate_summary_report(self, formats=None):
+        """生成汇总报告（默认 Markdown），显示每个人的上午、下午分数和总分，然后重置数据
+        
+        返回 Markdown 报告的路径；未生成 Markdown 时返回第一个生成的文件。
+        """
+        files = self.export_reports(formats)
+        
+        # 重置所有数据，开始新的一周
+        self.reset_all_data()
+        
+        return files.get('md') or next(iter(files.values()))
+    
+    def _breakpoint_mtime(self):
+        try:
+            return (self.cwd/'eggs/breakpoint.json').stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+    
+    def _load_breakpoints(self):
+        """读取全部断点数据（文件未变化时直接使用内存中的副本）"""
+        mtime = self._breakpoint_mtime()
+        # mtime 为 None 表示刚写入、尚未落盘的数据，以内存为准
+        if self._breakpoints is not None and self._breakpoints[1] in (None, mtime):
+            return self._breakpoints[0]
+        
+        try:
+            data = storage.read_json(self.cwd/'eggs/breakpoint.json')
+        except FileNotFoundError:
+            data = {}
+        self._breakpoints = [data, mtime]
+        return data
+    
+    def _write_breakpoints(self, data):
+        """写回全部断点数据，没有任何暂存时删除文件"""
+        breakpoint_file = self.cwd/'eggs/breakpoint.json'
+        self._breakpoints = [data, None]
+        if data:
+            storage.write_json(breakpoint_file, data, indent=2)
+        else:
+            storage.remove(breakpoint_file)
+        if not storage.in_transaction():
+            self._refresh_mtimes()
+    
+    def load_breakpoint(self, session):
+        """加载断点数据"""
+        # 返回指定session的暂存数据
+        return list(self._load_breakpoints().get(session, []))
+    
+    def save_breakpoint(self, session, present_students):
+        """保存断点数据"""
+        self.save_breakpoints({session: present_students})
+    
+    def save_breakpoints(self, drafts):
+        """一次保存多个 session 的断点数据，drafts 为 {session: 出勤名单}"""
+        data = dict(self._load_breakpoints())
+        data.update((session, list(names)) for session, names in drafts.items())
+        self._write_breakpoints(data)
+    
+    def clear_breakpoint(self, session):
+        """清除指定session的断点数据"""
+        data = self._load_breakpoints()
+        if session not in data:
+            return
+        
+        # 移除指定session的数据；如果没有其他session的数据则删除文件
+        data = dict(data)
+        del data[session]
+        self._write_breakpoints(data)
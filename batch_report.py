@@ -0,0 +1,141 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""多班级批量生成汇总报告
+
+每个班级一个项目目录（包含 bacon/Setting.yml 与 eggs/），在进程池中并行生成各自的报告，
+某个班级出错不影响其他班级，最后写一份按目录排序的总索引。
+"""
+import os
+import traceback
+import multiprocessing
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+STARTED_NOTE = ("处理中途子进程退出，报告可能已生成、数据可能已重置，为避免生成全为 0 的报告未重新处理；"
+                "请检查该目录的 reports/ 与 eggs/\n")
+
+def find_roots(paths):
+    """在给定目录（含其子目录）中查找项目目录，按路径排序去重后返回"""
+    roots = set()
+    for path in paths:
+        path = Path(path).resolve()
+        if (path / 'bacon' / 'Setting.yml').is_file():
+            roots.add(path)
+        for setting in path.rglob('bacon/Setting.yml'):
+            roots.add(setting.parent.parent)
+    return sorted(roots)
+
+def report_one(root, formats=None, reset=True):
+    """在子进程中为一个项目目录生成报告，返回 (root, {格式: 路径}, 错误信息)"""
+    try:
+        # 在子进程中导入，主进程只负责调度
+        from attendance import AttendanceSystem
+        system = AttendanceSystem(root)
+        files = system.export_reports(formats)
+        if reset:
+            system.reset_all_data()
+        return root, {fmt: str(path) for fmt, path in files.items()}, None
+    except Exception:
+        return root, {}, traceback.format_exc()
+
+# 子进程中指向共享的“已开始”标记数组（由进程池的 initializer 设置）
+_started = None
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+def _report_tracked(index, root, formats, reset):
+    """标记第 index 个目录已开始处理，再生成报告"""
+    _started[index] = 1
+    return report_one(root, formats, reset)
+
+def _result(root, future):
+    try:
+        return future.result()
+    except Exception:
+        # 子进程异常退出（如被杀死）时 future 本身会抛错
+        return root, {}, traceback.format_exc()
+
+def _run_isolated(roots, formats, reset, jobs):
+    """每个项目目录单独一个进程池：某个子进程崩溃只影响它自己的目录"""
+    results = {}
+    for start in range(0, len(roots), jobs):
+        chunk = roots[start:start + jobs]
+        pools = [ProcessPoolExecutor(max_workers=1) for _ in chunk]
+        try:
+            futures = [pool.submit(report_one, root, formats, reset) for pool, root in zip(pools, chunk)]
+            for root, future in zip(chunk, futures):
+                results[root] = _result(root, future)
+        finally:
+            for pool in pools:
+                pool.shutdown()
+    return results
+
+def run_batch(roots, formats=None, reset=True, jobs=None):
+    """并行处理所有项目目录，结果按 roots 的顺序返回（与完成先后无关）
+
+    某个子进程崩溃会使整个进程池失效（BrokenProcessPool），此时尚未完成的目录
+    改为各自在单独的进程中重新处理。已经开始处理的目录可能已写出报告并重置了数据，
+    reset 时不再重新处理（否则会生成一份全为 0 的报告），而是记为失败并提示检查。
+    """
+    roots = [Path(root) for root in roots]
+    if not roots:
+        return []
+    jobs = jobs or min(len(roots), os.cpu_count() or 1)
+    results = {}
+    unfinished = []
+    # 共享内存中的标记不经过队列缓冲，子进程在写入后立即崩溃也不会丢失
+    started = multiprocessing.RawArray('b', len(roots))
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(started,)) as pool:
+        futures = [pool.submit(_report_tracked, index, root, formats, reset) for index, root in enumerate(roots)]
+        for index, (root, future) in enumerate(zip(roots, futures)):
+            try:
+                results[root] = future.result()
+            except BrokenProcessPool:
+                if reset and started[index]:
+                    results[root] = (root, {}, traceback.format_exc() + STARTED_NOTE)
+                else:
+                    unfinished.append(root)
+            except Exception:
+                results[root] = (root, {}, traceback.format_exc())
+    if unfinished:
+        results.update(_run_isolated(unfinished, formats, reset, jobs))
+    return [results[root] for root in roots]
+
+def _link(path, directory):
+    """索引中指向报告的相对链接（不同盘符时退回绝对路径）"""
+    try:
+        return Path(os.path.relpath(path, directory)).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+def write_index(results, directory):
+    """写出总索引 Markdown，返回其路径"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    index_file = directory / f'批量汇总_{now.strftime("%Y%m%d_%H%M%S")}.md'
+    failed = sum(1 for _, _, error in results if error)
+    with open(index_file, 'w', encoding='utf-8') as f:
+        f.write(f"""# 批量考勤汇总索引
+
+**生成时间**: {now.strftime("%Y-%m-%d %H:%M:%S")}  
+**班级数**: {len(results)}，成功 {len(results) - failed}，失败 {failed}
+
+| 班级 | 状态 | 报告 |
+|------|------|------|
+""")
+        for root, files, error in results:
+            if error:
+                last_line = error.strip().splitlines()[-1].replace('|', '\\|')
+                f.write(f"| {Path(root).name} | 失败 | {last_line} |\n")
+            else:
+                links = ' '.join(f'[{fmt}]({_link(path, directory)})' for fmt, path in files.items())
+                f.write(f"| {Path(root).name} | 成功 | {links} |\n")
+        for root, _, error in results:
+            if error:
+                f.write(f"\n## {Path(root).name} 错误信息\n\n```\n{error}```\n")
+    return index_file
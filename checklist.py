@@ -0,0 +1,213 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""考勤窗口中的虚拟化勾选列表
+
+整个名单画在一个 Canvas 上，只为当前可见的几行创建图形项，滚动时再重画；
+勾选状态保存在一个普通的 set 中。无论名单多长，打开窗口的耗时基本不变。
+show() 可只显示名单中的一部分（搜索结果），勾选状态不受影响。
+"""
+import tkinter as tk
+import tkinter.ttk as ttk
+import tkinter.font as tkfont
+
+class CheckList(ttk.Frame):
+    """按 columns 个一行排列的勾选列表（与原来 display.win.row_num 的网格布局一致）"""
+
+    BOX = 13        # 勾选框边长
+    GAP = 6         # 勾选框与名字之间的距离
+    PADX = 5
+    PADY = 2
+
+    def __init__(self, master, names, columns=7, font=None, checked=(), on_change=None):
+        super().__init__(master)
+        self.on_change = on_change
+        self._rendered = None   # 当前已画出的行范围 (first, last)
+        self._items = {}        # 名单位置 -> 勾选框图形项
+
+        self.font = tkfont.Font(self, font=font) if font else tkfont.nametofont('TkDefaultFont')
+        style = ttk.Style(self)
+        self.fg = style.lookup('TCheckbutton', 'foreground') or 'black'
+        self.bg = style.lookup('TFrame', 'background') or self.winfo_toplevel().cget('bg')
+        self.accent = style.lookup('Accent.TButton', 'background') or '#005fb8'
+
+        self.canvas = tk.Canvas(self, bg=self.bg, highlightthickness=0)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._yview)
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            self.canvas.bind(sequence, self._on_wheel)
+        self.canvas.bind('<Configure>', lambda event: self.render())
+        self.canvas.bind('<Button-1>', self._on_click)
+
+        self.names = []
+        self.checked = set()
+        self.reconfigure(names, columns, checked=checked)
+
+    def reconfigure(self, names, columns=None, font=None, checked=None):
+        """更换名单、每行个数或字体（设置热更新时使用）
+
+        checked 为 None 时保留原有勾选中仍在新名单里的名字。
+        """
+        self.names = list(dict.fromkeys(names))  # 重名只保留一个
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if columns is not None:
+            self.columns = max(1, int(columns))
+        if font is not None:
+            self.font.configure(**tkfont.Font(self, font=font).actual())
+        source = self.checked if checked is None else checked
+        self.checked = {name for name in source if name in self.index}
+        self.shown = list(range(len(self.names)))  # 当前显示的名单位置
+
+        # 每格宽度按最长的名字估算，只测量一次
+        longest = max(self.names, key=len, default='')
+        self.cell_width = self.PADX * 2 + self.BOX + self.GAP + self.font.measure(longest)
+        self.cell_height = max(self.font.metrics('linespace'), self.BOX) + self.PADY * 2 + 4
+        self.rows = self._row_count()
+
+        # 行数不多时完整显示（不出现滚动条），否则最多占屏幕高度的一半
+        max_rows = max(1, int(self.winfo_screenheight() * 0.5) // self.cell_height)
+        visible_rows = max(1, min(self.rows, max_rows))
+        self.canvas.configure(width=self.cell_width * min(self.columns, max(1, len(self.names))),
+                              height=visible_rows * self.cell_height, yscrollincrement=self.cell_height)
+        if self.rows > visible_rows:
+            self.scrollbar.pack(side='right', fill='y', before=self.canvas)
+        else:
+            self.scrollbar.pack_forget()
+        self._update_scrollregion()
+        self._rendered = None
+        self.canvas.yview_moveto(0)
+        self.render()
+
+    def _row_count(self):
+        return (len(self.shown) + self.columns - 1) // self.columns
+
+    def _update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self.cell_width * self.columns, self.rows * self.cell_height))
+
+    def show(self, indices=None):
+        """只显示给定名单位置的名字（按给定顺序），None 表示显示全部"""
+        self.shown = list(range(len(self.names))) if indices is None else list(indices)
+        self.rows = self._row_count()
+        self._update_scrollregion()
+        self._rendered = None
+        self.canvas.yview_moveto(0)
+        self.render()
+
+    def shown_names(self):
+        """当前显示的名字"""
+        return [self.names[index] for index in self.shown]
+
+    # ---- 勾选状态 ----
+
+    def get(self):
+        """按名单顺序返回已勾选的名字"""
+        return [name for name in self.names if name in self.checked]
+
+    def is_checked(self, name):
+        return name in self.checked
+
+    def set_checked(self, names, checked=True):
+        """批量勾选或取消勾选"""
+        names = [name for name in names if name in self.index]
+        if checked:
+            self.checked.update(names)
+        else:
+            self.checked.difference_update(names)
+        self._changed(names)
+
+    def toggle(self, name):
+        if name not in self.index:
+            return
+        self.checked ^= {name}
+        self._changed([name])
+
+    def invert(self):
+        """反选整个名单"""
+        self.checked = set(self.names) - self.checked
+        self._changed(self.names)
+
+    def _changed(self, names):
+        for name in names:
+            self._paint(self.index[name])
+        if self.on_change is not None:
+            self.on_change()
+
+    # ---- 绘制 ----
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.render()
+
+    def _on_wheel(self, event):
+        if not self.scrollbar.winfo_ismapped():
+            return 'break'
+        if event.num == 4 or event.delta > 0:
+            self._yview('scroll', -1, 'units')
+        else:
+            self._yview('scroll', 1, 'units')
+        return 'break'
+
+    def render(self):
+        """只画出当前可见的行；可见范围没变时什么也不做"""
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        first = max(0, int(top // self.cell_height))
+        last = min(self.rows, int((top + height) // self.cell_height) + 1)
+        if self._rendered == (first, last):
+            return
+        self._rendered = (first, last)
+        self.canvas.delete('cell')
+        self._items.clear()
+        for position in range(first * self.columns, min(last * self.columns, len(self.shown))):
+            self._draw(position, self.shown[position])
+
+    def _cell_origin(self, position):
+        row, col = divmod(position, self.columns)
+        return col * self.cell_width + self.PADX, row * self.cell_height
+
+    def _draw(self, position, index):
+        x, y = self._cell_origin(position)
+        box_top = y + (self.cell_height - self.BOX) // 2
+        box = self.canvas.create_rectangle(x, box_top, x + self.BOX, box_top + self.BOX,
+                                           outline=self.fg, tags='cell')
+        self.canvas.create_text(x + self.BOX + self.GAP, y + self.cell_height // 2, anchor='w',
+                                text=self.names[index], font=self.font, fill=self.fg, tags='cell')
+        self._items[index] = box
+        self._paint(index)
+
+    def _paint(self, index):
+        """按勾选状态给勾选框上色（该格不在可见范围内时忽略）"""
+        box = self._items.get(index)
+        if box is None:
+            return
+        checked = self.names[index] in self.checked
+        self.canvas.itemconfigure(box, fill=self.accent if checked else '',
+                                  outline=self.accent if checked else self.fg)
+
+    def index_at(self, x, y):
+        """画布上某点对应的名单位置，落在空白处时返回 None"""
+        x, y = self.canvas.canvasx(x), self.canvas.canvasy(y)
+        col, row = int(x // self.cell_width), int(y // self.cell_height)
+        if not 0 <= col < self.columns or row < 0:
+            return None
+        position = row * self.columns + col
+        return self.shown[position] if position < len(self.shown) else None
+
+    def _on_click(self, event):
+        index = self.index_at(event.x, event.y)
+        if index is not None:
+            self.toggle(self.names[index])
+
+    def see(self, name):
+        """滚动到名字所在的行（名字未显示时忽略）"""
+        index = self.index.get(name)
+        if index is None or index not in self.shown:
+            return
+        row = self.shown.index(index) // self.columns
+        top = self.canvas.canvasy(0)
+        visible = max(1, self.canvas.winfo_height() // self.cell_height)
+        first = int(top // self.cell_height)
+        if row < first:
+            self._yview('moveto', row / self.rows)
+        elif row >= first + visible:
+            self._yview('moveto', (row - visible + 1) / self.rows)
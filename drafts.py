@@ -0,0 +1,56 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""考勤窗口勾选状态的自动暂存
+
+每次勾选只把该时段记为待保存，由调度器最多每 INTERVAL 秒统一写一次断点文件；
+关闭窗口或退出程序时再写一次，中途崩溃最多丢失最近几秒的勾选。
+"""
+import time
+
+class DraftSaver:
+    """把各考勤窗口的勾选状态防抖写入 eggs/breakpoint.json"""
+
+    INTERVAL = 2.0
+    KEY = ('drafts',)
+
+    def __init__(self, system, scheduler):
+        self.system = system
+        self.scheduler = scheduler
+        self._dirty = {}                # session -> CheckList
+        self._last_flush = float('-inf')
+
+    def mark(self, session, checklist):
+        """记下该时段的勾选有变化；距上次写入不足 INTERVAL 秒时推迟到期满再写"""
+        self._dirty[session] = checklist
+        if self.scheduler.deadline(self.KEY) is None:
+            self.scheduler.schedule_at(self.KEY, max(time.monotonic(), self._last_flush + self.INTERVAL),
+                                       self._autosave)
+
+    def discard(self, session):
+        """丢弃尚未写入的勾选（例如已经正式提交）"""
+        self._dirty.pop(session, None)
+        if not self._dirty:
+            self.scheduler.cancel(self.KEY)
+
+    def flush(self, session=None):
+        """立即写入待保存的勾选；session 为 None 时写入全部"""
+        sessions = list(self._dirty) if session is None else [session]
+        pending = {s: self._dirty.pop(s) for s in sessions if s in self._dirty}
+        if not self._dirty:
+            self.scheduler.cancel(self.KEY)
+        if not pending:
+            return
+        self._last_flush = time.monotonic()
+        try:
+            self.system.save_breakpoints({s: checklist.get() for s, checklist in pending.items()})
+        except Exception:
+            # 写入失败时保留为待保存，下次再试
+            for s, checklist in pending.items():
+                self._dirty.setdefault(s, checklist)
+            raise
+
+    def _autosave(self):
+        try:
+            self.flush()
+        except OSError:
+            pass  # 磁盘暂时不可写时不打扰用户，下一次勾选或关闭窗口时再写
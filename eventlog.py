@@ -0,0 +1,134 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""追加式考勤事件日志（storage.backend: eventlog）
+
+每次提交只在 eggs/events.log 末尾追加一行 JSON：
+    {"seq": 12, "date": "2025-10-09", "session": "morning", "present": ["..."]}
+各 session 的快照文件记录自己已包含到哪个 seq，加载时在快照上重放之后的事件。
+compact() 把已并入快照的事件移到 events.archive.log，保留完整的审计记录，并在
+events.log 开头写一行 {"last_seq": N}，使重启后的编号接着 N 继续，不会落到快照之前。
+"""
+import os
+import json
+from pathlib import Path
+
+import storage
+
+class EventLog:
+    """events.log 的读写，只处理原始事件，不依赖评分逻辑"""
+
+    def __init__(self, path, read_only=False):
+        """read_only 时不创建、不修复日志文件（文件不存在视为没有事件）"""
+        self.path = Path(path)
+        self.archive_path = self.path.with_name(self.path.stem + '.archive' + self.path.suffix)
+        if not read_only:
+            self.path.touch(exist_ok=True)
+            self._drop_torn_tail()
+        self.seq = 0
+        self.count = 0
+        header = False
+        for record in self._records():
+            if 'last_seq' in record:
+                header = True
+                self.seq = max(self.seq, record['last_seq'])
+            else:
+                self.seq = max(self.seq, record['seq'])
+                self.count += 1
+        if not header:
+            # 没有编号记录的旧日志：编号接着归档日志的最后一条
+            self.seq = max(self.seq, self._archived_seq())
+
+    def _archived_seq(self):
+        """归档日志中最后一个事件的 seq（没有归档时为 0）"""
+        try:
+            with open(self.archive_path, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                f.seek(max(0, end - 64 * 1024))
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return 0
+        for line in reversed(lines):
+            try:
+                return json.loads(line)['seq']
+            except (ValueError, KeyError, TypeError):
+                continue
+        return 0
+
+    def _drop_torn_tail(self):
+        """截掉末尾写了一半的行（写入中途断电等），否则之后追加的事件会接在这一行上而无法解析"""
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            pos = end
+            keep = 0
+            while pos > 0:
+                step = min(4096, pos)
+                pos -= step
+                f.seek(pos)
+                newline = f.read(step).rfind(b'\n')
+                if newline >= 0:
+                    keep = pos + newline + 1
+                    break
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _records(self):
+        """按顺序读出日志中的每一行（事件与编号记录）；末尾写了一半的行会被忽略"""
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def events(self, after=0, session=None):
+        """按顺序读出 seq > after 的事件"""
+        for event in self._records():
+            if 'last_seq' in event:
+                continue
+            if event['seq'] <= after:
+                continue
+            if session is not None and event['session'] != session:
+                continue
+            yield event
+
+    def append(self, events):
+        """追加若干事件（自动编号），写入后 fsync，返回最后一个 seq"""
+        lines = []
+        for event in events:
+            self.seq += 1
+            lines.append(json.dumps({'seq': self.seq, **event}, ensure_ascii=False) + '\n')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        self.count += len(lines)
+        return self.seq
+
+    def compact(self, upto):
+        """把 seq <= upto 的事件移入归档日志，events.log 只保留之后的事件"""
+        folded, kept = [], []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if 'last_seq' in event:
+                    continue
+                (folded if event['seq'] <= upto else kept).append(line)
+        if folded:
+            with open(self.archive_path, 'a', encoding='utf-8') as f:
+                f.writelines(folded)
+                f.flush()
+                os.fsync(f.fileno())
+        header = json.dumps({'last_seq': self.seq}) + '\n'
+        storage.write_text(self.path, header + ''.join(kept))
+        self.count = len(kept)
@@ -1,415 +1,85 @@
 # licensed under the MIT License.
 # partly using AI code generation, but mostly hand-coded.
+import time
+_STARTED = time.perf_counter()
+import sys
 import tkinter as tk
 import tkinter.messagebox as ms
-import subprocess, yaml, json
-import threading
-import time
-from pathlib import Path
 from datetime import datetime, timedelta
-import sv_ttk
 import tkinter.ttk as ttk
+from attendance import ContinuousScoring, AttendanceSystem
+from checklist import CheckList
+from nameindex import NameIndex
+from scheduler import Scheduler, Countdown
+from drafts import DraftSaver
+# sv_ttk、subprocess 在用到时才导入，以加快启动
+
+class StartupProfiler:
+    """--profile-startup：记录并打印启动各阶段（含导入）的耗时"""
+    
+    def __init__(self, enabled, started):
+        self.enabled = enabled
+        self.started = self.last = started
+        self.phases = []
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def report(self):
+        if not self.enabled:
+            return
+        for phase, seconds in self.phases:
+            print(f"{phase:<24}{seconds * 1000:8.1f} ms", file=sys.stderr)
+        print(f"{'合计':<24}{(self.last - self.started) * 1000:8.1f} ms", file=sys.stderr)
 
-# sv_ttk.set_theme('light')
-class ContinuousScoring:
-    """连续考勤评分系统，替代生成器的可序列化类"""
-    
-    def __init__(self, max_days=7):
-        self.scoring = [0]  # 连续出勤天数记录
-        self.history = []   # 历史出勤记录
-        self.max_days = max_days
-        self.current_day = 0
-    
-    def record_attendance(self, today_arrived):
-        """记录当天考勤"""
-        if today_arrived:
-            self.scoring[-1] += 1
-        else:
-            self.scoring.append(0)
-        
-        self.history.append(today_arrived)
-        self.current_day += 1
-        
-        # 只保留最近max_days*2天的记录，避免内存过度增长
-        if len(self.history) > self.max_days * 2:
-            self.history = self.history[-self.max_days*2:]
-    
-    def calculate_scores(self):
-        """计算3天和7天连续出勤分数"""
-        # 不使用最近max_days天的记录进行计算
-#        recent_history = self.history[-self.max_days:] if len(self.history) >= self.max_days else self.history
-        recent_history = self.history[:]
-        # 重建连续出勤记录
-        scoring = [0]
-        for arrived in recent_history:
-            if arrived:
-                scoring[-1] += 1
-            else:
-                scoring.append(0)
-        
-        # 计算分数
-        # 将 >=7 视为7天奖励，避免因 scoring 中有 >7 的值而漏计
-#        _7_day = sum(1 for j in scoring if j >= 7)
-#        _3_day = sum(1 for j in scoring if 3 <= j < 7)
-        _3_day, _7_day = 0,0
-        while scoring:
-            n = scoring.pop(0)
-            if n < 3:
-                # 不加分
-                continue
-            if 3 <= n< 7:
-                # 加3天的分
-                _3_day+=1
-                continue
-            # 如果来了10天，那么既要加7天的，也要加3天的
-            _7_day += 1
-            scoring.append(n-7)
-        return _3_day, _7_day
-    
-    def get_current_streak(self):
-        """获取当前连续出勤天数"""
-        return self.scoring[-1] if self.scoring else 0
-    
-    def get_total_attendance(self):
-        """获取总出勤天数"""
-        return sum(self.history)
-    
-    def get_attendance_rate(self):
-        """获取出勤率"""
-        if len(self.history) == 0:
-            return 0
-        return sum(self.history) / len(self.history)
-    
-    def reset_data(self):
-        """重置数据，开始新的一周"""
-        self.scoring = [0]
-        self.history = []
-        self.current_day = 0
-    
-    def to_dict(self):
-        """转换为可序列化的字典"""
-        return {
-            'scoring': self.scoring,
-            'history': self.history,
-            'max_days': self.max_days,
-            'current_day': self.current_day
-        }
-    
-    @classmethod
-    def from_dict(cls, data):
-        """从字典恢复对象（包含简单校验与容错）"""
-        # 解析并校验 max_days
-        max_days_raw = data.get('max_days', 7)
-        try:
-            max_days = int(max_days_raw)
-            if max_days < 1:
-                max_days = 7
-        except Exception:
-            max_days = 7
-
-        obj = cls(max_days)
-        # 确保 scoring 为整数列表，至少包含一个元素
-        raw_scoring = data.get('scoring', [0]) or [0]
-        try:
-            obj.scoring = [int(x) for x in raw_scoring]
-        except Exception:
-            obj.scoring = [0]
-
-        # 确保 history 为布尔列表
-        raw_history = data.get('history', []) or []
-        try:
-            obj.history = [bool(x) for x in raw_history]
-        except Exception:
-            obj.history = []
-
-        # current_day 尽量与 history 长度保持一致性
-        try:
-            obj.current_day = int(data.get('current_day', len(obj.history)))
-        except Exception:
-            obj.current_day = len(obj.history)
-
-        if not obj.scoring:
-            obj.scoring = [0]
-
-        return obj
-
-class AttendanceSystem:
-    def __init__(self):
-        self.cwd = Path.cwd()
-        self.setup_directories()
-        self.setting = self.load_settings()
-        # 支持两种 display 配置位置：display.win.* 或 display.*（向后兼容）
-        display = self.setting.get('display', {}) or {}
-        win_cfg = display.get('win') if isinstance(display.get('win'), dict) else {}
-        font = win_cfg.get('font') or display.get('font') or 'Microsoft YaHei UI'
-        font_size = win_cfg.get('font_size') or display.get('font_size') or 10
-        self.font_chinese = (font, font_size)
-    
-    def setup_directories(self):
-        """创建必要的目录"""
-        if not (self.cwd/'eggs').exists():
-            (self.cwd/'eggs').mkdir()
-        if not (self.cwd/'bacon').exists():
-            (self.cwd/'bacon').mkdir()
-        if not (self.cwd/'reports').exists():
-            (self.cwd/'reports').mkdir()
-    
-    def load_settings(self):
-        """加载或创建设置文件"""
-        settings_file = self.cwd/'bacon/Setting.yml'
-    
-        if not settings_file.exists():
-            # 创建默认设置
-            default_settings = {
-                'points': {
-                    '_3_days': 1,
-                    '_7_days': 3
-                },
-                'timer': {
-                    'on': True,
-                    'morning': '7:05',
-                    'afternoon': '13:05'
-                },
-                'display': {
-                    'win': {
-                        'row_num': 7,
-                        'font': 'Microsoft YaHei UI',
-                        'font_size': 10
-                    },
-                    'md': {
-                        'column_num': 12
-                    }
-                },
-                'namelist': ['sexy','stupid','sweet','sleepy']
-            }
-            # 将默认设置写入文件
-            with open(settings_file, 'w', encoding='utf-8') as fp:
-                yaml.dump(default_settings, fp, allow_unicode=True)
-            return default_settings
-        else:
-            # 尝试不同的编码读取文件
-            encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        
-            for encoding in encodings:
-                try:
-                    with open(settings_file, 'r', encoding=encoding) as fp:
-                        return yaml.safe_load(fp)
-                except (UnicodeDecodeError, yaml.YAMLError):
-                    continue
-        
-            # 如果所有编码都失败，使用错误处理方式读取
-            with open(settings_file, 'r', encoding='utf-8', errors='replace') as fp:
-                return yaml.safe_load(fp)
-    
-    def load_student_data(self, session):
-        """加载学生数据"""
-        data_file = self.cwd/f'eggs/{session}_data.json'
-        
-        if data_file.exists():
-            with open(data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 从字典恢复ContinuousScoring对象
-            students = {}
-            for name, student_data in data.items():
-                students[name] = ContinuousScoring.from_dict(student_data)
-            
-            return students
-        else:
-            # 创建新的学生数据，使用配置中的 max_days（若存在）
-            students = {}
-            raw_max = self.setting.get('max_days', 7)
-            try:
-                max_days = int(raw_max)
-                if max_days < 1:
-                    max_days = 7
-            except Exception:
-                max_days = 7
-
-            for name in self.setting['namelist']:
-                students[name] = ContinuousScoring(max_days=max_days)
-            
-            self.save_student_data(session, students)
-            return students
-    
-    def save_student_data(self, session, students):
-        """保存学生数据"""
-        data_file = self.cwd/f'eggs/{session}_data.json'
-        
-        # 转换为可序列化的字典
-        data = {}
-        for name, student in students.items():
-            data[name] = student.to_dict()
-        
-        with open(data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    def record_attendance(self, session, present_students):
-        """记录考勤"""
-        students = self.load_student_data(session)
-        
-        # 更新每个学生的考勤记录
-        for name, student in students.items():
-            arrived = name in present_students
-            student.record_attendance(arrived)
-        
-        # 保存更新后的数据
-        self.save_student_data(session, students)
-        
-        # 计算并显示分数
-        scores = {}
-        for name, student in students.items():
-            scores[name] = student.calculate_scores()
-        
-        return scores
-    
-    def reset_all_data(self):
-        """重置所有学生的数据，开始新的一周"""
-        sessions = ["morning", "afternoon"]
-        for session in sessions:
-            students = self.load_student_data(session)
-            for student in students.values():
-                student.reset_data()
-            self.save_student_data(session, students)
-    
-    def generate_summary_report(self):
-        """生成汇总报告并保存为Markdown文件，显示每个人的上午、下午分数和总分（简化版）"""
-        # 加载上午和下午的数据
-        morning_students = self.load_student_data("morning")
-        afternoon_students = self.load_student_data("afternoon")
-        
-        # 获取学生列表
-        students = self.setting['namelist']
-        
-        # 准备报告数据
-        report_data = []
-        
-        for name in students:
-            morning_student = morning_students.get(name, ContinuousScoring())
-            afternoon_student = afternoon_students.get(name, ContinuousScoring())
-            
-            # 计算分数
-            morning_3day, morning_7day = morning_student.calculate_scores()
-            afternoon_3day, afternoon_7day = afternoon_student.calculate_scores()
-            
-            # 计算各部分分数
-            morning_total = morning_3day * self.setting['points']['_3_days'] + morning_7day * self.setting['points']['_7_days']
-            afternoon_total = afternoon_3day * self.setting['points']['_3_days'] + afternoon_7day * self.setting['points']['_7_days']
-            total_score = morning_total + afternoon_total
-            
-            report_data.append({
-                'name': name,
-                'morning_total': morning_total,
-                'afternoon_total': afternoon_total,
-                'total_score': total_score
-            })
-        
-        # 获取阶段时长
-        max_day = 7  # 默认值
-        if students and name in morning_students:
-            max_day = len(morning_students[name].history)
-        
-        # 生成Markdown表格
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        md_content = f"""# 阶段性考勤汇总报告
-
-**生成时间**: {timestamp}  
-**本阶段结束，开始新的一阶段**
-> 本阶段时长: {max_day}天
-
-## 本阶段分数统计
-
-| 姓名 | 上午分数 | 下午分数 | 总分数 |
-|------|----------|----------|--------|
-"""
-        
-        # 添加每个学生的数据行
-        for data in report_data:
-            md_content += f"| {data['name']} | **{data['morning_total']}** | **{data['afternoon_total']}** | **{data['total_score']}** |\n"
-        
-        # 添加分数说明
-        md_content += f"""
-## 分数说明
-
-- 连续出勤3天及以上但不足7天: {self.setting['points']['_3_days']}分/次
-- 连续出勤7天: {self.setting['points']['_7_days']}分/次
-
-## 注意
+# 检查 bacon/Setting.yml 是否被修改的间隔（秒）
+SETTINGS_POLL_SECONDS = 2.0
 
-本阶段考勤数据已重置，下一阶段将重新开始统计。
-    """
-        
-        # 保存Markdown文件
-        report_file = self.cwd / 'reports' / f'考勤汇总_{datetime.now().strftime("%Y%m%d_%H%M%S")}.md'
-        with open(report_file, 'w', encoding='utf-8') as f:
-            f.write(md_content)
-        
-        # 重置所有数据，开始新的一周
-        self.reset_all_data()
-        
-        return report_file
-    
-    def load_breakpoint(self, session):
-        """加载断点数据"""
-        breakpoint_file = self.cwd/'eggs/breakpoint.json'
-        
-        if breakpoint_file.exists():
-            with open(breakpoint_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 返回指定session的暂存数据
-            return data.get(session, [])
-        else:
-            return []
-    
-    def save_breakpoint(self, session, present_students):
-        """保存断点数据"""
-        breakpoint_file = self.cwd/'eggs/breakpoint.json'
-        
-        # 加载现有的断点数据
-        if breakpoint_file.exists():
-            with open(breakpoint_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        else:
-            data = {}
-        
-        # 更新指定session的暂存数据
-        data[session] = present_students
-        
-        # 保存更新后的数据
-        with open(breakpoint_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    
-    def clear_breakpoint(self, session):
-        """清除指定session的断点数据"""
-        breakpoint_file = self.cwd/'eggs/breakpoint.json'
-        
-        if breakpoint_file.exists():
-            with open(breakpoint_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 移除指定session的数据
-            if session in data:
-                del data[session]
-            
-            # 如果还有其他session的数据，保存；否则删除文件
-            if data:
-                with open(breakpoint_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
-            else:
-                breakpoint_file.unlink()
+PROFILE = StartupProfiler('--profile-startup' in sys.argv, _STARTED)
+PROFILE.mark('导入 tkinter/attendance')
 
 class AttendanceGUI:
     """考勤系统GUI"""
     
     def __init__(self):
-        self.system = AttendanceSystem()
         self.win = tk.Tk()
+        PROFILE.mark('创建主窗口')
+        self.scheduler = Scheduler(self.win)  # 自动提交等定时任务
+        self.countdown = Countdown(self.scheduler)
+        self.drafts = None  # 自动暂存，在加载设置后创建
+        self.attendance_windows = {}  # 存储考勤窗口的引用
+        self.countdown_labels = {}    # session -> 考勤窗口中的倒计时标签
+        self._name_index = None        # (名单, NameIndex)
+        self.attendance_context = {}   # session -> (时段名称, CheckList)，供设置热更新使用
+        self.submitted = set()         # 已提交、结果对话框尚未关闭的 session
+        self.setup_ui()
+        # 先把主窗口画出来，再加载设置、主题与样式
+        self.win.update()
+        PROFILE.mark('首次绘制主窗口')
+        self.finish_startup()
+    
+    def finish_startup(self):
+        """加载设置并应用主题与样式（在主窗口显示之后执行）"""
+        self.system = AttendanceSystem()
+        self.drafts = DraftSaver(self.system, self.scheduler)
+        PROFILE.mark('加载设置')
+        import sv_ttk
+        PROFILE.mark('导入 sv_ttk')
         # 从设置读取主题，默认 light
-        theme = self.system.setting.get('display', {}).get('theme', 'light')
-        sv_ttk.set_theme(theme)  # 在创建 root 后立即设置主题
-
-        # 全局样式配置：字体与常用控件样式
+        self.theme = self.system.settings.theme
+        sv_ttk.set_theme(self.theme)
+        PROFILE.mark('应用主题')
+
+        self.apply_styles()
+        PROFILE.mark('配置样式')
+        PROFILE.report()
+        # 定时检查设置文件，设置程序保存后无需重启即可生效
+        self.scheduler.schedule(('watch_settings',), SETTINGS_POLL_SECONDS, self.watch_settings)
+    
+    def apply_styles(self):
+        """全局样式配置：字体与常用控件样式"""
         style = ttk.Style(self.win)
         font_chinese = self.system.font_chinese
         style.configure('TLabel', font=font_chinese)
@@ -417,9 +87,41 @@ class AttendanceGUI:
         style.configure('TCheckbutton', font=font_chinese)
         style.configure('Accent.TButton', font=font_chinese)  # sv_ttk 提供的强调按钮样式
         style.configure('Countdown.TLabel', foreground='blue', font=font_chinese)
-
-        self.setup_ui()
-        self.attendance_windows = {}  # 存储考勤窗口的引用
+    
+    def watch_settings(self):
+        """设置文件有变化时重新加载，并把新的名单、分数、定时与字体应用到已打开的窗口"""
+        try:
+            changed = self.system.reload_settings()
+        except Exception:
+            # 文件可能正在被设置程序写入，下次再读
+            changed = False
+        if changed:
+            self.apply_settings()
+        self.scheduler.schedule(('watch_settings',), SETTINGS_POLL_SECONDS, self.watch_settings)
+    
+    def apply_settings(self):
+        """应用重新加载的设置（分数在提交与生成报告时直接读取设置，无需处理）"""
+        theme = self.system.settings.theme
+        if theme != self.theme:
+            import sv_ttk
+            sv_ttk.set_theme(theme)
+            self.theme = theme
+        self.apply_styles()
+        
+        for session, attendance_win in list(self.attendance_windows.items()):
+            if not attendance_win.winfo_exists() or session in self.submitted:
+                continue
+            session_name, checklist = self.attendance_context[session]
+            # 新名单中仍然存在的勾选保持不变
+            checklist.reconfigure(self.system.settings.namelist, self.checklist_columns(),
+                                  font=self.system.font_chinese)
+            # 按新的定时设置重新安排自动提交
+            self.start_auto_submit_timer(session, session_name, attendance_win, checklist,
+                                         checklist.names)
+    
+    def checklist_columns(self):
+        """考勤窗口每行显示的人数"""
+        return self.system.settings.row_num
     
     def setup_ui(self):
         """设置用户界面（使用 ttk 控件以便 sv_ttk 生效）"""
@@ -455,18 +157,19 @@ class AttendanceGUI:
             ms.showinfo("报告生成成功", f"汇总报告已生成:\n{report_file}\n\n本周数据已重置，下周将重新开始统计。")
             # 尝试打开报告文件
             try:
+                import subprocess
                 subprocess.Popen(['start', '', str(report_file)], shell=True)
             except:
                 pass  # 如果打开失败，忽略错误
         except Exception as e:
             ms.showerror("错误", f"生成报告时出错:\n{str(e)}")
     
-    def submit_attendance(self, session, session_name, attendance_win, vars, students_list):
+    def submit_attendance(self, session, session_name, attendance_win, checklist, students_list):
         """提交考勤记录"""
-        settings_pronoun = self.system.setting.get('display', {}).get('win', {}).get('pronoun', '同学')
+        settings_pronoun = self.system.settings.pronoun
         try:
             # 获取选中的学生
-            present_students = [name for name, var in vars.items() if var.get()]
+            present_students = checklist.get()
             
             # 从settings.yml中读取display/win/pronoun设置
 
@@ -474,77 +177,83 @@ class AttendanceGUI:
                 ms.showwarning("警告", "请至少选择一名%s后再提交考勤。" % settings_pronoun)
                 return
             
-            # 记录考勤
-            scores = self.system.record_attendance(session, present_students)
+            # 同一窗口只提交一次；先取消自动提交：结果对话框打开期间调度器仍在运行，
+            # 到点后不能对同一窗口再提交一次
+            if session in self.submitted:
+                return
+            self.scheduler.cancel(('auto_submit', session))
+            self.submitted.add(session)
             
-            # 清除断点数据
-            self.system.clear_breakpoint(session)
+            # 记录考勤并清除断点数据，两者合并为一次落盘；尚未自动暂存的勾选不再需要
+            self.drafts.discard(session)
+            try:
+                with self.system.batch():
+                    scores = self.system.record_attendance(session, present_students)
+                    self.system.clear_breakpoint(session)
+            except Exception:
+                # 没有记录成功：恢复暂存与自动提交，允许再次提交
+                self.submitted.discard(session)
+                self.drafts.mark(session, checklist)
+                self.start_auto_submit_timer(session, session_name, attendance_win, checklist, students_list)
+                raise
             
-            # 加载学生数据用于显示
+            # 加载学生数据用于显示（命中缓存，不会重新读取文件）
             students_data = self.system.load_student_data(session)
             
             # 显示结果
             result_text = f"{session_name}今日已签到{len(students_data)}"
             
             ms.showinfo("考勤结果", result_text)
-            attendance_win.destroy()
-            
-            # 从窗口字典中移除
-            if session in self.attendance_windows:
-                del self.attendance_windows[session]
+            self.close_attendance(session, attendance_win)
                 
         except KeyError as e:
             ms.showerror("数据错误", f"{settings_pronoun}数据不完整: {str(e)}\n请检查设置文件中的{settings_pronoun}名单。")
         except Exception as e:
             ms.showerror("错误", f"提交考勤时出错:\n{str(e)}")
     
-    def save_breakpoint_data(self, session, session_name, vars):
+    def close_attendance(self, session, attendance_win):
+        """关闭考勤窗口，并取消该窗口的自动提交；未提交的勾选会写入断点数据"""
+        if self.attendance_windows.get(session) is attendance_win:
+            self.scheduler.cancel(('auto_submit', session))
+            self.submitted.discard(session)
+            self.countdown_labels.pop(session, None)
+            self.attendance_context.pop(session, None)
+            try:
+                self.drafts.flush(session)
+            except Exception as e:
+                ms.showerror("错误", f"暂存数据时出错:\n{str(e)}")
+            del self.attendance_windows[session]
+        attendance_win.destroy()
+    
+    def save_breakpoint_data(self, session, session_name, checklist):
         """保存断点数据（暂存）"""
         try:
-            # 获取选中的学生
-            present_students = [name for name, var in vars.items() if var.get()]
-            
-            # 保存到断点文件
-            self.system.save_breakpoint(session, present_students)
+            # 立即写入，不必等待自动暂存
+            self.drafts.mark(session, checklist)
+            self.drafts.flush(session)
             
             ms.showinfo("暂存成功", f"{session_name}考勤数据已暂存，下次打开时会自动恢复。")
             
         except Exception as e:
             ms.showerror("错误", f"暂存数据时出错:\n{str(e)}")
     
-    def parse_time_string(self, time_str):
-        """解析时间字符串，返回 (小时, 分钟)"""
-        try:
-            parts = time_str.split(':')
-            hour = int(parts[0])
-            minute = int(parts[1])
-            return hour, minute
-        except (ValueError, IndexError):
-            # 解析失败时返回默认值：早上(7:05)或下午(13:05)
-            if "morning" in time_str:
-                return 7, 5
-            else:
-                return 13, 5
-    
-    def start_auto_submit_timer(self, session, session_name, attendance_win, vars, students):
-        """启动自动提交定时器"""
+    def start_auto_submit_timer(self, session, session_name, attendance_win, checklist, students):
+        """启动自动提交定时器；再次调用时（设置热更新）按新的设置重新安排"""
+        countdown_label = self.countdown_labels.get(session)
+        
         # 检查是否启用定时器
-        timer_enabled = self.system.setting.get('timer', {}).get('on', True)
-        if not timer_enabled:
+        if not self.system.settings.timer_on:
+            self.scheduler.cancel(('auto_submit', session))
+            if countdown_label is not None:
+                self.countdown.remove(countdown_label)
+                countdown_label.destroy()
+                del self.countdown_labels[session]
+            attendance_win.title(f"{session_name}考勤")
             return
         
-        # 计算目标时间
+        # 计算目标时间（设置加载时已解析为 datetime.time）
         now = datetime.now()
-        
-        # 从设置中获取时间
-        if session == "morning":
-            time_str = self.system.setting.get('timer', {}).get('morning', '7:05')
-        else:  # afternoon
-            time_str = self.system.setting.get('timer', {}).get('afternoon', '13:05')
-        
-        # 解析时间字符串
-        hour, minute = self.parse_time_string(time_str)
-        target_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        target_time = datetime.combine(now.date(), self.system.settings.timer_for(session))
         
         # 如果目标时间已经过去，则设置为明天的同一时间
         if target_time < now:
@@ -553,98 +262,130 @@ class AttendanceGUI:
         # 计算等待时间（秒）
         wait_seconds = (target_time - now).total_seconds()
         
-        # 创建定时器线程
-        timer_thread = threading.Timer(wait_seconds, self.auto_submit, 
-                                      [session, session_name, attendance_win, vars, students])
-        timer_thread.daemon = True
-        timer_thread.start()
+        # 交给调度器在主线程中执行；同一时段重复打开窗口时只保留最新的定时任务
+        deadline = self.scheduler.schedule(('auto_submit', session), wait_seconds, self.auto_submit,
+                                           session, session_name, attendance_win, checklist, students)
         
         # 更新窗口标题显示自动提交时间
         time_str_display = target_time.strftime("%H:%M")
         attendance_win.title(f"{session_name}考勤 - 自动提交时间: {time_str_display}")
         
-        # 添加倒计时标签
-        countdown_label = tk.Label(attendance_win, text=f"自动提交倒计时: {int(wait_seconds//60)}分钟", 
-                                  font=self.system.font_chinese, fg="blue")
-        countdown_label.pack(pady=5)
-        
-        # 启动倒计时更新
-        self.update_countdown(countdown_label, wait_seconds, session, session_name, 
-                             attendance_win, vars, students)
+        # 添加倒计时标签，由所有窗口共用的倒计时统一刷新
+        if countdown_label is None:
+            countdown_label = tk.Label(attendance_win, fg="blue")
+            countdown_label.pack(pady=5)
+            self.countdown_labels[session] = countdown_label
+        countdown_label.config(font=self.system.font_chinese)
+        self.countdown.add(countdown_label, deadline)
     
-    def update_countdown(self, label, remaining_seconds, session, session_name, 
-                        attendance_win, vars, students):
-        """更新倒计时显示"""
-        if remaining_seconds > 0 and attendance_win.winfo_exists():
-            minutes = int(remaining_seconds // 60)
-            seconds = int(remaining_seconds % 60)
-            label.config(text=f"自动提交倒计时: {minutes}分{seconds}秒")
-            # 1秒后再次更新
-            attendance_win.after(1000, self.update_countdown, label, remaining_seconds-1, 
-                               session, session_name, attendance_win, vars, students)
-    
-    def auto_submit(self, session, session_name, attendance_win, vars, students):
-        """自动提交考勤"""
+    def auto_submit(self, session, session_name, attendance_win, checklist, students):
+        """自动提交考勤（由调度器在主线程中调用）"""
         if attendance_win.winfo_exists():
-            # 在主线程中执行提交
-            attendance_win.after(0, self.submit_attendance, session, session_name, 
-                               attendance_win, vars, students)
+            self.submit_attendance(session, session_name, attendance_win, checklist, students)
+    
+    def name_index(self, names):
+        """名单的搜索索引，名单不变时复用，不必每次打开窗口都重建"""
+        key = tuple(names)
+        if self._name_index is None or self._name_index[0] != key:
+            self._name_index = (key, NameIndex(names))
+        return self._name_index[1]
+    
+    def bind_search(self, entry, search_var, checklist):
+        """考勤窗口的输入即搜与键盘批量勾选"""
+        def on_search(*_):
+            # 名单不变时复用同一个索引（名单可能被设置热更新替换）
+            checklist.show(self.name_index(checklist.names).search(search_var.get()))
+        
+        def toggle_first(event):
+            shown = checklist.shown_names()
+            if search_var.get().strip() and shown:
+                search_var.set('')
+                checklist.toggle(shown[0])
+                checklist.see(shown[0])
+            return 'break'
+        
+        def check_shown(event):
+            checklist.set_checked(checklist.shown_names())
+            search_var.set('')
+            return 'break'
+        
+        def check_all(event):
+            checklist.set_checked(checklist.names)
+            return 'break'
+        
+        def invert(event):
+            checklist.invert()
+            return 'break'
+        
+        def clear(event):
+            search_var.set('')
+            return 'break'
+        
+        search_var.trace_add('write', on_search)
+        entry.bind('<Return>', toggle_first)
+        entry.bind('<KP_Enter>', toggle_first)
+        entry.bind('<Control-Return>', check_shown)
+        entry.bind('<Control-a>', check_all)
+        entry.bind('<Control-i>', invert)
+        entry.bind('<Escape>', clear)
+        entry.focus_set()
     
     def take_attendance(self, session, session_name):
         """执行考勤记录（改用 ttk 控件）"""
+        # 该时段的考勤窗口已经打开时，切换到该窗口
+        existing = self.attendance_windows.get(session)
+        if existing is not None and existing.winfo_exists():
+            existing.deiconify()
+            existing.lift()
+            existing.focus_force()
+            return
+        
         # 创建考勤窗口
         attendance_win = tk.Toplevel(self.win)
         attendance_win.title(f"{session_name}考勤")
 
         # 存储窗口引用
         self.attendance_windows[session] = attendance_win
+        attendance_win.protocol('WM_DELETE_WINDOW', lambda: self.close_attendance(session, attendance_win))
 
         # 获取学生列表和显示设置
-        students = self.system.setting['namelist']
-        display = self.system.setting.get('display', {}) or {}
-        columns_per_row = display.get('win', {}).get('row_num', display.get('columns_per_row', 7))
+        students = self.system.settings.namelist
+        columns_per_row = self.checklist_columns()
 
         # 使用 ttk.Frame
         main_frame = ttk.Frame(attendance_win, padding=10)
         main_frame.pack(fill='both', expand=True)
-        settings_pronoun = self.system.setting.get('display', {}).get('win', {}).get('pronoun', '他们')
+        settings_pronoun = self.system.settings.pronoun
         ttk.Label(main_frame, text=f"请{session_name}早到的{settings_pronoun}上来打勾:").pack(pady=(0, 10))
 
-        # 复选框容器
-        checkboxes_frame = ttk.Frame(main_frame)
-        checkboxes_frame.pack(fill='both', expand=True)
-
-        vars = {}
-        checkbuttons = []
-
-        for i, name in enumerate(students):
-            row = i // columns_per_row
-            col = i % columns_per_row
-
-            vars[name] = tk.BooleanVar()
-            cb = ttk.Checkbutton(checkboxes_frame, text=name, variable=vars[name])
-            cb.grid(row=row, column=col, sticky='w', padx=5, pady=2)
-            checkbuttons.append(cb)
-
-        # 加载断点数据并恢复选中状态
-        breakpoint_students = self.system.load_breakpoint(session)
-        for name in breakpoint_students:
-            if name in vars:
-                vars[name].set(True)
+        # 搜索框：可输入名字或拼音首字母（如 zs），快捷键见下方提示
+        search_var = tk.StringVar()
+        search_entry = ttk.Entry(main_frame, textvariable=search_var)
+        search_entry.pack(fill='x', pady=(0, 2))
+        ttk.Label(main_frame, text="回车 勾选/取消首个匹配  Ctrl+回车 勾选全部匹配  "
+                                   "Ctrl+A 全选  Ctrl+I 反选  Esc 清空搜索").pack(pady=(0, 5))
+
+        # 勾选列表只画出可见的行，并恢复断点数据中的选中状态
+        checklist = CheckList(main_frame, students, columns_per_row, font=self.system.font_chinese,
+                              checked=self.system.load_breakpoint(session),
+                              on_change=lambda: self.drafts.mark(session, checklist))
+        checklist.pack(fill='both', expand=True)
+        self.bind_search(search_entry, search_var, checklist)
+        self.attendance_context[session] = (session_name, checklist)
 
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(pady=10)
 
         # 暂存和提交按钮（注意用 ttk，不使用 bg 参数）
         ttk.Button(button_frame, text="暂存",
-                   command=lambda: self.save_breakpoint_data(session, session_name, vars),
+                   command=lambda: self.save_breakpoint_data(session, session_name, checklist),
                    width=10).pack(side='left', padx=5)
         ttk.Button(button_frame, text="立即提交",
-                   command=lambda: self.submit_attendance(session, session_name, attendance_win, vars, students),
+                   command=lambda: self.submit_attendance(session, session_name, attendance_win, checklist, students),
                    width=10, style='Accent.TButton').pack(side='left', padx=5)
 
         # 启动自动提交定时器（倒计时标签使用自定义样式）
-        self.start_auto_submit_timer(session, session_name, attendance_win, vars, students)
+        self.start_auto_submit_timer(session, session_name, attendance_win, checklist, students)
 
         attendance_win.update()
         attendance_win.minsize(attendance_win.winfo_width(), attendance_win.winfo_height())
@@ -652,6 +393,11 @@ class AttendanceGUI:
     def run(self):
         """运行应用程序"""
         self.win.mainloop()
+        # 写入尚未自动暂存的勾选
+        self.drafts.flush()
+        self.scheduler.shutdown()
+        # 退出前写回缓存中尚未保存的数据
+        self.system.flush()
 
 # 运行应用程序
 if __name__ == "__main__":
@@ -0,0 +1,70 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""名单的前缀搜索索引（考勤窗口的输入即搜）
+
+每个名字登记若干个搜索键：名字本身、拼音首字母（张三 -> zs），安装了 pypinyin
+时还有全拼（zhangsan）。所有键排好序后用二分查找前缀，每次按键只需 O(log n)。
+没有 pypinyin 时用 GB2312 编码区间推算一级汉字的拼音首字母。
+"""
+import bisect
+
+# GB2312 一级汉字按拼音排序，各首字母的起始编码
+_GB2312_STARTS = [
+    0xB0A1, 0xB0C5, 0xB2C1, 0xB4EE, 0xB6EA, 0xB7A2, 0xB8C1, 0xB9FE, 0xBBF7, 0xBFA6, 0xC0AC, 0xC2E8,
+    0xC4C3, 0xC5B6, 0xC5BE, 0xC6DA, 0xC8BB, 0xC8F6, 0xCBFA, 0xCDDA, 0xCEF4, 0xD1B9, 0xD4D1,
+]
+_GB2312_LETTERS = 'abcdefghjklmnopqrstwxyz'
+_GB2312_END = 0xD7F9
+
+def _initial(char):
+    """单个字符的拼音首字母；非汉字原样返回小写，无法推算的汉字返回该字本身"""
+    if char.isascii():
+        return char.lower()
+    try:
+        raw = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return char
+    if len(raw) != 2:
+        return char
+    code = raw[0] << 8 | raw[1]
+    if not _GB2312_STARTS[0] <= code <= _GB2312_END:
+        return char  # 二级汉字按部首排序，无法由编码推算
+    return _GB2312_LETTERS[bisect.bisect_right(_GB2312_STARTS, code) - 1]
+
+def _load_pinyin():
+    """返回把名字转为 (首字母, 全拼) 的函数；未安装 pypinyin 时返回 None"""
+    try:
+        from pypinyin import lazy_pinyin, Style
+    except ImportError:
+        return None
+    def pinyin(name):
+        return (''.join(lazy_pinyin(name, style=Style.FIRST_LETTER)).lower(),
+                ''.join(lazy_pinyin(name)).lower())
+    return pinyin
+
+def name_keys(name, pinyin=None):
+    """一个名字的全部搜索键（小写、去掉空白）；pinyin 为 _load_pinyin() 的结果"""
+    compact = ''.join(name.split())
+    keys = {compact.lower(), ''.join(_initial(char) for char in compact)}
+    if pinyin is not None:
+        keys.update(pinyin(compact))
+    keys.discard('')
+    return keys
+
+class NameIndex:
+    """对一份名单建立一次，之后每次输入只做二分查找"""
+
+    def __init__(self, names):
+        pinyin = _load_pinyin()
+        entries = sorted((key, i) for i, name in enumerate(names) for key in name_keys(name, pinyin))
+        self._keys = [key for key, _ in entries]
+        self._positions = [i for _, i in entries]
+
+    def search(self, query):
+        """返回任一搜索键以 query 开头的名单位置（按名单顺序）；query 为空时返回 None"""
+        query = ''.join(query.split()).lower()
+        if not query:
+            return None
+        lo = bisect.bisect_left(self._keys, query)
+        hi = bisect.bisect_left(self._keys, query + '\U0010ffff')
+        return sorted(set(self._positions[lo:hi]))
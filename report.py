@@ -0,0 +1,135 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""汇总报告：一次计分得到的分数表，以及各种输出格式
+
+AttendanceSystem.build_score_table 计算一次 ScoreTable，之后每个导出器都复用同一张表，
+同时输出多种格式也只需计分一次。
+"""
+import csv
+import json
+import heapq
+import itertools
+
+# display.md.sort 的取值与对应的排序键（index 为名单中的位置，用于保持并列时的名单顺序）
+REPORT_SORT_KEYS = {
+    'score+': lambda row: (row['total_score'], row['index']),
+    'score-': lambda row: (-row['total_score'], row['index']),
+}
+
+# 导出到 CSV/TSV/JSON Lines 的列
+COLUMNS = ('name', 'morning_total', 'afternoon_total', 'total_score')
+
+def sort_report_rows(rows, order='atz', top=0):
+    """按 display.md.sort 排列报告行，top>0 时只取前 top 行
+
+    atz/zta 直接按名单位置正序/倒序输出，无需排序；score+/score- 使用预先算好的
+    (总分, 名单位置) 键，只要前几名时用堆取 top-K，不对整个名单排序。
+    """
+    if order == 'zta':
+        ordered = reversed(rows)
+    elif order in REPORT_SORT_KEYS:
+        key = REPORT_SORT_KEYS[order]
+        if 0 < top < len(rows):
+            return heapq.nsmallest(top, rows, key=key)
+        ordered = sorted(rows, key=key)
+    else:
+        ordered = iter(rows)
+    if top > 0:
+        return itertools.islice(ordered, top)
+    return ordered
+
+class ScoreTable:
+    """一次计分的结果：每位成员一行，外加生成报告所需的公共信息"""
+
+    def __init__(self, rows, points, max_day, timestamp):
+        self.rows = rows            # [{'index', 'name', 'morning_total', 'afternoon_total', 'total_score'}]
+        self.points = points        # {'_3_days': ..., '_7_days': ...}
+        self.max_day = max_day      # 本阶段时长（天）
+        self.timestamp = timestamp  # 生成时间 datetime
+        self._ordered = {}
+
+    def ordered(self, order='atz', top=0):
+        """按指定顺序返回各行；同一顺序只排序一次，供多个导出器共用"""
+        key = (order, top)
+        if key not in self._ordered:
+            self._ordered[key] = list(sort_report_rows(self.rows, order, top))
+        return self._ordered[key]
+
+def export_markdown(table, f, rows):
+    """中文 Markdown 报告（原有格式）"""
+    f.write(f"""# 阶段性考勤汇总报告
+
+**生成时间**: {table.timestamp.strftime("%Y-%m-%d %H:%M:%S")}  
+**本阶段结束，开始新的一阶段**
+> 本阶段时长: {table.max_day}天
+
+## 本阶段分数统计
+
+| 姓名 | 上午分数 | 下午分数 | 总分数 |
+|------|----------|----------|--------|
+""")
+    for data in rows:
+        f.write(f"| {data['name']} | **{data['morning_total']}** | **{data['afternoon_total']}** | **{data['total_score']}** |\n")
+    f.write(f"""
+## 分数说明
+
+- 连续出勤3天及以上但不足7天: {table.points['_3_days']}分/次
+- 连续出勤7天: {table.points['_7_days']}分/次
+
+## 注意
+
+本阶段考勤数据已重置，下一阶段将重新开始统计。
+    """)
+
+def _export_delimited(f, rows, delimiter):
+    writer = csv.writer(f, delimiter=delimiter, lineterminator='\n')
+    writer.writerow(COLUMNS)
+    writer.writerows([row[column] for column in COLUMNS] for row in rows)
+
+def export_csv(table, f, rows):
+    _export_delimited(f, rows, ',')
+
+def export_tsv(table, f, rows):
+    _export_delimited(f, rows, '\t')
+
+def export_jsonl(table, f, rows):
+    """每行一个 JSON 对象"""
+    for row in rows:
+        f.write(json.dumps({column: row[column] for column in COLUMNS}, ensure_ascii=False))
+        f.write('\n')
+
+# 格式名 -> (扩展名, 文件编码, 导出函数)；CSV/TSV 带 BOM，方便 Excel 直接打开中文
+EXPORTERS = {
+    'md': ('md', 'utf-8', export_markdown),
+    'csv': ('csv', 'utf-8-sig', export_csv),
+    'tsv': ('tsv', 'utf-8-sig', export_tsv),
+    'jsonl': ('jsonl', 'utf-8', export_jsonl),
+}
+
+def check_formats(formats):
+    """校验报告格式（至少一种、全部受支持），返回去重后的列表；不合法时抛出 ValueError"""
+    formats = list(dict.fromkeys(formats))
+    if not formats:
+        raise ValueError("至少需要一种报告格式")
+    unknown = [fmt for fmt in formats if fmt not in EXPORTERS]
+    if unknown:
+        raise ValueError(f"不支持的报告格式: {', '.join(map(str, unknown))}（可选: {', '.join(EXPORTERS)}）")
+    return formats
+
+def write_reports(table, directory, stem, formats=('md',), order='atz', top=0):
+    """把同一张分数表写成多种格式，返回 {格式: 文件路径}
+
+    写入任何文件之前先校验全部格式，不会只写出一部分报告。
+    order/top（display.md.sort/top）只影响 Markdown 报告；CSV/TSV/JSON Lines
+    供表格软件使用，始终按名单顺序包含全部成员。
+    """
+    formats = check_formats(formats)
+    files = {}
+    for fmt in formats:
+        ext, encoding, exporter = EXPORTERS[fmt]
+        rows = table.ordered(order, top) if fmt == 'md' else table.rows
+        path = directory / f'{stem}.{ext}'
+        with open(path, 'w', encoding=encoding, buffering=1 << 16) as f:
+            exporter(table, f, rows)
+        files[fmt] = path
+    return files
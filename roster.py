@@ -0,0 +1,216 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""名单文件的读取、导出与名单编辑模型（不依赖 tkinter，供设置界面与命令行共用）"""
+import csv
+import json
+import codecs
+from pathlib import Path
+
+SAMPLE_SIZE = 64 * 1024
+
+def detect_encoding(sample):
+    """根据文件开头的原始字节判断编码：BOM、UTF-8、GB18030（兼容 GBK），最后退回 latin-1"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    for encoding in ('utf-8', 'gb18030'):
+        try:
+            # 样本末尾可能截断了一个多字节字符，用增量解码器忽略结尾不完整的部分
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=False)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+def _dialect(sample_text):
+    """自动检测分隔符；只有一列（每行一个名字）时无法检测，按普通 CSV 处理"""
+    try:
+        return csv.Sniffer().sniff(sample_text, delimiters=',;\t|')
+    except csv.Error:
+        return csv.excel
+
+def _iter_names(path, encoding):
+    with open(path, 'r', encoding=encoding, newline='') as f:
+        dialect = _dialect(f.read(16 * 1024))
+        f.seek(0)
+        for row in csv.reader(f, dialect):
+            if row:
+                name = row[0].strip()
+                if name:
+                    yield name
+
+def iter_csv_names(path):
+    """逐行读取 CSV/文本文件，依次产出每行第一列的名字（跳过空行与空名字）
+
+    编码只根据文件开头判断；若样本之后才出现按 UTF-8 无法解码的字节（例如开头全是
+    ASCII 的 GBK 文件），改用 GB18030 从头重读一次，跳过已经产出的名字。
+    名字中的字节不会被替换为 �，无法解码时抛出 ValueError。
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(SAMPLE_SIZE)
+    encoding = detect_encoding(sample)
+    count = 0
+    ascii_only = True
+    try:
+        for name in _iter_names(path, encoding):
+            count += 1
+            ascii_only = ascii_only and name.isascii()
+            yield name
+        return
+    except UnicodeDecodeError as e:
+        # 已产出的名字若含非 ASCII 字符，换编码重读会得到不同的名字，只能报错
+        if encoding != 'utf-8' or not ascii_only:
+            raise ValueError(f"无法识别文件编码（{encoding}）: {e}") from None
+    try:
+        for index, name in enumerate(_iter_names(path, 'gb18030')):
+            if index >= count:
+                yield name
+    except UnicodeDecodeError as e:
+        raise ValueError(f"无法识别文件编码（utf-8/gb18030）: {e}") from None
+
+def read_csv_names(path):
+    """读取文件中的名字，按首次出现的顺序去重"""
+    return list(dict.fromkeys(iter_csv_names(path)))
+
+class NamelistModel:
+    """设置界面中名单的数据模型：按顺序保存名字，并维护 名字 -> 位置 的索引
+
+    names 列表始终原地修改，可以直接作为 config['namelist'] 使用。
+    """
+
+    def __init__(self, names=()):
+        self.names = []
+        self._index = {}
+        self.reset(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def index(self, name):
+        return self._index[name]
+
+    def _reindex(self, start=0):
+        for i in range(start, len(self.names)):
+            self._index[self.names[i]] = i
+
+    def reset(self, names):
+        """替换整个名单（重名只保留第一个）"""
+        self.names[:] = dict.fromkeys(names)
+        self._index = {}
+        self._reindex()
+
+    def append(self, name):
+        """在末尾添加名字，返回其位置；名字已存在时抛出 ValueError"""
+        if name in self._index:
+            raise ValueError(f"'{name}' 已在名单中")
+        self._index[name] = len(self.names)
+        self.names.append(name)
+        return len(self.names) - 1
+
+    def extend(self, names):
+        """追加名单中还没有的名字，返回实际追加的名字"""
+        added = [name for name in dict.fromkeys(names) if name not in self._index]
+        for name in added:
+            self.append(name)
+        return added
+
+    def rename(self, index, name):
+        """修改某个位置的名字；新名字与其他人重名时抛出 ValueError"""
+        old = self.names[index]
+        if name == old:
+            return
+        if name in self._index:
+            raise ValueError(f"'{name}' 已在名单中")
+        del self._index[old]
+        self.names[index] = name
+        self._index[name] = index
+
+    def remove(self, indices):
+        """一次删除多个位置，返回被删除的名字（按原顺序）"""
+        indices = sorted(set(indices))
+        if not indices:
+            return []
+        removed = [self.names[i] for i in indices]
+        for name in removed:
+            del self._index[name]
+        drop = set(indices)
+        self.names[indices[0]:] = [name for i, name in enumerate(self.names[indices[0]:], indices[0])
+                                   if i not in drop]
+        self._reindex(indices[0])
+        return removed
+
+    def move(self, index, offset):
+        """把某个位置的名字上移（offset<0）或下移，返回新位置；越界时不移动"""
+        target = index + offset
+        if not 0 <= target < len(self.names) or offset == 0:
+            return index
+        name = self.names.pop(index)
+        self.names.insert(target, name)
+        self._reindex(min(index, target))
+        return target
+
+    def filter(self, query):
+        """名字中包含 query（不区分大小写）的位置；query 为空时返回 None"""
+        query = query.strip().lower()
+        if not query:
+            return None
+        return [i for i, name in enumerate(self.names) if query in name.lower()]
+
+# 导出名单时可附加的列（见 AttendanceSystem.iter_member_stats）
+STAT_COLUMNS = ('morning_streak', 'afternoon_streak', 'total_score')
+EXPORT_FORMATS = ('csv', 'txt', 'json')
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def export_format(path, fmt=None):
+    """导出格式：未指定时按扩展名判断，无法判断时为 txt"""
+    fmt = (fmt or Path(path).suffix.lstrip('.') or 'txt').lower()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"不支持的导出格式: {fmt}（可选: {', '.join(EXPORT_FORMATS)}）")
+    return fmt
+
+def export_names(path, rows, fmt=None, with_stats=False, chunk_size=1000):
+    """把名单写入文件，返回写入的人数
+
+    rows 为 {'name': ...} 字典的可迭代对象，with_stats 时还需包含 STAT_COLUMNS 各列。
+    逐块写入，不在内存中拼出整个文件。CSV 带 BOM，方便 Excel 直接打开中文。
+    """
+    fmt = export_format(path, fmt)
+    columns = ('name',) + STAT_COLUMNS if with_stats else ('name',)
+    count = 0
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    with open(path, 'w', encoding=encoding, newline='', buffering=1 << 16) as f:
+        if fmt == 'csv':
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(columns)
+        elif fmt == 'txt' and with_stats:
+            f.write('\t'.join(columns) + '\n')
+        elif fmt == 'json':
+            f.write('[')
+        
+        for chunk in _chunks(rows, chunk_size):
+            if fmt == 'csv':
+                writer.writerows([row[column] for column in columns] for row in chunk)
+            elif fmt == 'txt':
+                f.write(''.join('\t'.join(str(row[column]) for column in columns) + '\n' for row in chunk))
+            else:
+                items = (json.dumps({column: row[column] for column in columns} if with_stats else row['name'],
+                                    ensure_ascii=False) for row in chunk)
+                f.write(('\n' if count == 0 else ',\n') + ',\n'.join(items))
+            count += len(chunk)
+        
+        if fmt == 'json':
+            f.write('\n]\n' if count else ']\n')
+    return count
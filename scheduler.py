@@ -0,0 +1,166 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""GUI 的定时任务调度（全部在 Tk 主线程中执行，不另开线程）
+
+所有任务按到期时间放在一个堆里，同一时刻只挂一个 Tk after 回调，指向最早到期的任务。
+每个任务有一个键（例如 ('auto_submit', 'morning')），同一个键再次安排时会替换旧任务。
+Countdown 在同一个调度器上刷新所有考勤窗口的倒计时。
+"""
+import math
+import heapq
+import itertools
+import time
+import tkinter as tk
+
+class Scheduler:
+    """以 Tk after 驱动的定时任务表"""
+
+    # 单次 after 的最长等待，到时重新核对时间，避免系统休眠等导致的偏差
+    MAX_WAIT = 60.0
+
+    def __init__(self, widget):
+        self.widget = widget
+        self._heap = []         # [到期时间, 序号, 键, 回调, 参数, 有效]
+        self._tasks = {}        # 键 -> 堆中的条目
+        self._seq = itertools.count()
+        self._after_id = None
+        self._closed = False
+
+    def schedule(self, key, delay, callback, *args):
+        """delay 秒后在主线程中调用 callback(*args)，返回到期时间（time.monotonic()）"""
+        return self.schedule_at(key, time.monotonic() + max(0.0, delay), callback, *args)
+
+    def schedule_at(self, key, deadline, callback, *args):
+        """在 time.monotonic() 到达 deadline 时调用 callback(*args)；同一个键只保留最新的任务"""
+        if self._closed:
+            return deadline
+        self._discard(key)
+        entry = [deadline, next(self._seq), key, callback, args, True]
+        heapq.heappush(self._heap, entry)
+        self._tasks[key] = entry
+        self._rearm()
+        return deadline
+
+    def cancel(self, key):
+        """取消任务（不存在时忽略）"""
+        if self._discard(key):
+            self._rearm()
+
+    def deadline(self, key):
+        """任务的到期时间，任务不存在时返回 None"""
+        entry = self._tasks.get(key)
+        return entry[0] if entry is not None else None
+
+    def shutdown(self):
+        """取消所有任务，之后不再接受新任务"""
+        self._closed = True
+        self._tasks.clear()
+        self._heap.clear()
+        self._cancel_after()
+
+    def _discard(self, key):
+        # 堆中的条目只做标记，等到达堆顶时再丢弃
+        entry = self._tasks.pop(key, None)
+        if entry is None:
+            return False
+        entry[-1] = False
+        return True
+
+    def _cancel_after(self):
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass  # 窗口已销毁
+            self._after_id = None
+
+    def _rearm(self):
+        """让唯一的 after 回调指向最早到期的任务"""
+        while self._heap and not self._heap[0][-1]:
+            heapq.heappop(self._heap)
+        self._cancel_after()
+        if self._closed or not self._heap:
+            return
+        wait = min(max(0.0, self._heap[0][0] - time.monotonic()), self.MAX_WAIT)
+        # 向上取整，避免 after 比到期时间早一点触发后空转
+        self._after_id = self.widget.after(math.ceil(wait * 1000), self._run)
+
+    def _run(self):
+        self._after_id = None
+        due = []
+        now = time.monotonic()
+        while self._heap and self._heap[0][0] <= now and not self._closed:
+            _, _, key, callback, args, alive = heapq.heappop(self._heap)
+            if not alive:
+                continue
+            del self._tasks[key]
+            due.append((callback, args))
+        # 先重新挂好下一次 after，再把到期任务各自作为独立的 Tk 事件执行：
+        # 某个任务弹出模态对话框时，其余任务（另一时段的自动提交、暂存、倒计时）照常运行
+        self._rearm()
+        for callback, args in due:
+            self.widget.after(0, self._dispatch, callback, args)
+
+    def _dispatch(self, callback, args):
+        if not self._closed:
+            callback(*args)
+
+class Countdown:
+    """所有考勤窗口共用的自动提交倒计时
+
+    剩余时间每次都由 time.monotonic() 的截止时刻算出，不会因为回调延迟或休眠而累积误差；
+    所有倒计时标签共用调度器中的一个任务，距离截止较远时只在分钟数变化时刷新，
+    最后 NEAR 秒内才每秒刷新。
+    """
+
+    NEAR = 120
+    KEY = ('countdown',)
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self._labels = {}   # 标签 -> 截止时刻
+
+    def add(self, label, deadline):
+        """显示到 deadline（time.monotonic()）为止的倒计时"""
+        self._labels[label] = deadline
+        self._tick()
+
+    def remove(self, label):
+        self._labels.pop(label, None)
+
+    @classmethod
+    def format(cls, remaining):
+        if remaining > cls.NEAR:
+            return f"自动提交倒计时: {math.ceil(remaining / 60)}分钟"
+        seconds = math.ceil(remaining)
+        return f"自动提交倒计时: {seconds // 60}分{seconds % 60}秒"
+
+    @classmethod
+    def _next_change(cls, remaining):
+        """距离显示内容下一次变化还有多少秒；已到时返回 None"""
+        if remaining <= 0:
+            return None
+        if remaining > cls.NEAR:
+            return remaining - (math.ceil(remaining / 60) - 1) * 60
+        return remaining - (math.ceil(remaining) - 1)
+
+    def _tick(self):
+        now = time.monotonic()
+        wait = None
+        for label, deadline in list(self._labels.items()):
+            try:
+                remaining = max(0.0, deadline - now)
+                label.config(text=self.format(remaining))
+            except tk.TclError:
+                del self._labels[label]  # 窗口已关闭
+                continue
+            change = self._next_change(remaining)
+            if change is None:
+                del self._labels[label]
+            elif wait is None or change < wait:
+                wait = change
+        if wait is None:
+            self.scheduler.cancel(self.KEY)
+        else:
+            # 稍晚一点再刷新，确保越过显示变化的边界
+            self.scheduler.schedule(self.KEY, wait + 0.01, self._tick)
@@ -0,0 +1,179 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""考勤系统命令行入口（不加载 tkinter，可在无图形界面的服务器上运行）
+
+用法示例:
+    python -m seab record morning today.txt          # 一个文件 = 一天，每行一个名字
+    python -m seab record afternoon d1.txt d2.txt    # 多个文件 = 连续多天
+    python -m seab record morning --days --date 2025-09-01 < backfill.txt
+                                                     # 每行一天，名字用逗号分隔，"-" 表示无人出勤
+    python -m seab report --format md --format csv   # 生成报告并重置本阶段数据
+    python -m seab report --no-reset                 # 只生成报告
+    python -m seab check                             # 用 numpy 批量计分核对分数
+    python -m seab batch-report classes/ --jobs 4     # 并行为 classes/ 下每个班级生成报告并写总索引
+    python -m seab export-namelist names.csv --stats # 导出名单，附带当前连续出勤天数与分数
+    python -m seab reset --yes                       # 重置本阶段数据
+"""
+import re
+import sys
+import argparse
+
+import roster
+import fastscore
+import batch_report
+from attendance import AttendanceSystem
+
+SESSIONS = {'morning': 'morning', 'afternoon': 'afternoon', '上午': 'morning', '下午': 'afternoon'}
+
+def _split_names(line):
+    return [name.strip() for name in re.split(r'[,，\t]', line) if name.strip()]
+
+def _read_lines(path):
+    if path == '-':
+        return sys.stdin.read().splitlines()
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return f.read().splitlines()
+
+def read_days(paths, per_line=False):
+    """读取出勤名单，返回每天的出勤名字列表"""
+    days = []
+    for path in paths or ['-']:
+        lines = _read_lines(path)
+        if per_line:
+            for line in lines:
+                if not line.strip():
+                    continue
+                days.append([] if line.strip() == '-' else _split_names(line))
+        else:
+            # 空输入不算作一天（否则会记为全员缺勤），无人出勤需明确写 '-'
+            content = [line.strip() for line in lines if line.strip()]
+            if not content:
+                continue
+            if content == ['-']:
+                days.append([])
+                continue
+            day = []
+            for line in content:
+                day.extend(_split_names(line))
+            days.append(day)
+    return days
+
+def cmd_record(system, args):
+    session = SESSIONS[args.session]
+    days = read_days(args.files, args.days)
+    if not days:
+        print("没有读到任何出勤名单，未记录（无人出勤请输入 '-'）", file=sys.stderr)
+        return 1
+    roster = set(system.settings.namelist)
+
+    unknown = sorted({name for day in days for name in day if name not in roster})
+    if unknown:
+        print(f"警告: 以下名字不在名单中，将被忽略: {', '.join(unknown)}", file=sys.stderr)
+
+    # 所有天一次性记录，只加载、保存一次
+    system.record_many(session, days, start_date=args.date)
+    print(f"已记录 {session} {len(days)} 天")
+    return 0
+
+def cmd_report(system, args):
+    if args.vectorized and not fastscore.HAS_NUMPY:
+        print("未安装 numpy，改用逐人计分", file=sys.stderr)
+        args.vectorized = False
+    files = system.export_reports(args.format, system.build_score_table(args.vectorized))
+    if not args.no_reset:
+        system.reset_all_data()
+    for path in files.values():
+        print(path)
+    return 0
+
+def cmd_check(system, args):
+    if not fastscore.HAS_NUMPY:
+        print("核对分数需要安装 numpy", file=sys.stderr)
+        return 2
+    mismatches = system.verify_scores()
+    for session, name, scalar, vectorized in mismatches:
+        print(f"{session} {name}: 增量计分 {scalar}，批量计分 {vectorized}")
+    print(f"核对完成，{len(mismatches)} 处不一致")
+    return 1 if mismatches else 0
+
+def cmd_batch_report(system, args):
+    roots = batch_report.find_roots(args.paths)
+    if not roots:
+        print("未找到包含 bacon/Setting.yml 的项目目录", file=sys.stderr)
+        return 1
+    results = batch_report.run_batch(roots, args.format, not args.no_reset, args.jobs)
+    index_file = batch_report.write_index(results, args.output)
+    failed = [root for root, _, error in results if error]
+    for root in failed:
+        print(f"失败: {root}", file=sys.stderr)
+    print(index_file)
+    return 1 if failed else 0
+
+def cmd_export_namelist(system, args):
+    if args.stats:
+        rows = system.iter_member_stats()
+    else:
+        rows = ({'name': name} for name in system.settings.namelist)
+    count = roster.export_names(args.output, rows, args.format, args.stats)
+    print(f"已导出 {count} 人到 {args.output}")
+    return 0
+
+def cmd_reset(system, args):
+    if not args.yes:
+        print("重置会清空本阶段的考勤数据，确认请加 --yes", file=sys.stderr)
+        return 1
+    system.reset_all_data()
+    print("本阶段数据已重置")
+    return 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='seab', description='考勤系统命令行工具')
+    parser.add_argument('--root', default=None, help='项目目录（包含 bacon/、eggs/），默认当前目录')
+    parser.set_defaults(needs_system=True, read_only=False)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    record = sub.add_parser('record', help='记录考勤（可一次补录多天）')
+    record.add_argument('session', choices=sorted(SESSIONS), help='时段')
+    record.add_argument('files', nargs='*', help="名单文件，每个文件为一天（内容为 '-' 表示无人出勤）；省略或 '-' 表示从标准输入读取")
+    record.add_argument('--days', action='store_true', help="每行为一天，名字用逗号分隔，'-' 表示无人出勤")
+    record.add_argument('--date', help='第一天的日期 YYYY-MM-DD，默认使最后一天为今天')
+    record.set_defaults(func=cmd_record)
+
+    rep = sub.add_parser('report', help='生成汇总报告')
+    rep.add_argument('--format', action='append', choices=['md', 'csv', 'tsv', 'jsonl'],
+                     help='输出格式，可重复指定；默认取设置中的 report.formats')
+    rep.add_argument('--no-reset', action='store_true', help='生成报告后不重置数据')
+    rep.add_argument('--vectorized', action='store_true', help='用 numpy 对全员批量计分（适合大名单）')
+    rep.set_defaults(func=cmd_report)
+
+    check = sub.add_parser('check', help='用 numpy 批量计分核对每个人的分数')
+    check.set_defaults(func=cmd_check)
+
+    batch = sub.add_parser('batch-report', help='并行为多个班级目录生成报告并汇总索引')
+    batch.add_argument('paths', nargs='+', help='班级目录或其上级目录（会递归查找 bacon/Setting.yml）')
+    batch.add_argument('--jobs', type=int, default=None, help='并行进程数，默认为 CPU 核数')
+    batch.add_argument('--format', action='append', choices=['md', 'csv', 'tsv', 'jsonl'],
+                       help='输出格式，可重复指定；默认取各班级设置中的 report.formats')
+    batch.add_argument('--no-reset', action='store_true', help='生成报告后不重置数据')
+    batch.add_argument('--output', default='reports', help='总索引的输出目录，默认 ./reports')
+    batch.set_defaults(func=cmd_batch_report, needs_system=False)
+
+    export = sub.add_parser('export-namelist', help='导出名单到 CSV/TXT/JSON 文件')
+    export.add_argument('output', help='输出文件')
+    export.add_argument('--format', choices=roster.EXPORT_FORMATS, help='导出格式，默认按扩展名判断')
+    export.add_argument('--stats', action='store_true', help='附带每人当前的连续出勤天数与本阶段分数')
+    # 导出只读取数据，不创建或迁移任何文件
+    export.set_defaults(func=cmd_export_namelist, read_only=True)
+
+    reset = sub.add_parser('reset', help='重置本阶段数据')
+    reset.add_argument('--yes', action='store_true', help='确认重置')
+    reset.set_defaults(func=cmd_reset)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    system = AttendanceSystem(args.root, read_only=args.read_only) if args.needs_system else None
+    return args.func(system, args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,11 +2,15 @@
 # partly using AI code generation, but mostly hand-coded.
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-import yaml, csv
+import yaml
 import os
+import copy
 import sv_ttk
 from pathlib import Path
 import sys
+import storage
+import settings_loader
+import roster
 
 def import_csv_namelist(sa):
     """从CSV文件导入学生名单"""
@@ -24,29 +28,8 @@ def import_csv_namelist(sa):
         if not file_path:
             return  # 用户取消了选择
             
-        # 读取CSV文件
-        imported_names = []
-        with open(file_path, 'r', encoding='utf-8') as csvfile:
-            # 尝试不同的分隔符
-            for encoding in ['utf-8', 'gbk', 'latin-1']:
-                try:
-                    csvfile.seek(0)  # 重置文件指针
-                    # 自动检测分隔符
-                    sample = csvfile.read(1024)
-                    csvfile.seek(0)
-                    sniffer = csv.Sniffer()
-                    dialect = sniffer.sniff(sample)
-                    
-                    reader = csv.reader(csvfile, dialect)
-                    for row in reader:
-                        if row:  # 跳过空行
-                            # 假设第一列是学生姓名
-                            name = row[0].strip()
-                            if name and name not in imported_names:
-                                imported_names.append(name)
-                    break  # 成功读取，跳出循环
-                except (UnicodeDecodeError, csv.Error):
-                    continue
+        # 读取CSV文件：按原始字节判断一次编码，逐行读取并按出现顺序去重
+        imported_names = roster.read_csv_names(file_path)
         
         if not imported_names:
             messagebox.showwarning("警告", "未找到有效的学生姓名数据")
@@ -64,14 +47,7 @@ def import_csv_namelist(sa):
         
         if result:
             # 添加到现有名单（去重）
-            current_list = list(sa.config["namelist"])
-            for name in imported_names:
-                if name not in current_list:
-                    current_list.append(name)
-                    
-            sa.config["namelist"] = current_list
-            sa.namelist_var.set(current_list)
-            sa.update_stats()
+            sa.append_names(imported_names)
             messagebox.showinfo("成功", f"成功导入 {len(imported_names)} 个学生")
             
     except Exception as e:
@@ -96,6 +72,7 @@ class SettingsApp:
         self.config_path.parent.mkdir(parents=True, exist_ok=True)
         self.import_csv_namelist = import_csv_namelist.__get__(self)
         self.config = self.load_config()
+        self.use_namelist()
         
         # 创建主窗口并应用 sv_ttk 主题
         self.root = tk.Tk()
@@ -120,63 +97,38 @@ class SettingsApp:
         """加载配置文件"""
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r', encoding='utf-8') as file:
-                    config = yaml.safe_load(file)
-                    # 确保配置结构完整
-                    return self.ensure_config_structure(config)
+                config = settings_loader.load(self.config_path)
+                # 确保配置结构完整
+                return self.ensure_config_structure(config)
             else:
                 return self.create_default_config()
         except Exception as e:
             messagebox.showerror("错误", f"加载配置文件失败: {str(e)}")
             return self.create_default_config()
     
-    def create_default_config(self):
-        """创建默认配置"""
-        default_config = {
-            "points": {"_3_days": 1, "_7_days": 2.5},
-            "timer": {"on": True, "morning": "7:05", "afternoon": "14:05"},
-            "display": {
-                "win": {
-                    "row_num": 7, 
-                    "font": "Microsoft YaHei UI", 
-                    "font_size": 10
-                },
-                "md": {"column_num": 12},
-                "theme": "light"
-            },
-            "namelist": ["sweet", "sleepy", "stupid", "sexy"],
-            "project": {
-                "url": "https://github.com/Jack-tendy-538/scoring-early-bird-new",
-                "license": "MIT License",
-                "version": "1.0.0.3"
-            }
-        }
-        self.save_config(default_config)
+    def use_namelist(self):
+        """由 NamelistModel 管理 config['namelist']（二者为同一个列表）"""
+        self.namelist = roster.NamelistModel(self.config["namelist"])
+        self.config["namelist"] = self.namelist.names
+    
+    def create_default_config(self, save=True):
+        """创建默认配置，save 为 False 时只返回默认值而不写入文件"""
+        default_config = copy.deepcopy(settings_loader.DEFAULTS)
+        if save:
+            self.save_config(default_config)
         return default_config
     
     def ensure_config_structure(self, config):
         """确保配置结构完整，添加缺失的字段"""
-        defaults = self.create_default_config()
-        
-        # 递归合并配置，确保所有默认字段都存在
-        def merge_dicts(default, current):
-            result = default.copy()
-            for key, value in current.items():
-                if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key] = merge_dicts(result[key], value)
-                else:
-                    result[key] = value
-            return result
-        
-        return merge_dicts(defaults, config)
+        return settings_loader.with_defaults(config)
     
     def save_config(self, config=None):
-        """保存配置文件"""
+        """保存配置文件（原子替换，正在运行的考勤程序不会读到写了一半的文件）"""
         if config is None:
             config = self.config
         try:
-            with open(self.config_path, 'w', encoding='utf-8') as file:
-                yaml.dump(config, file, default_flow_style=False, allow_unicode=True, indent=2)
+            storage.write_text(self.config_path,
+                               yaml.dump(config, default_flow_style=False, allow_unicode=True, indent=2))
             return True
         except Exception as e:
             messagebox.showerror("错误", f"保存配置失败: {str(e)}")
@@ -261,7 +213,7 @@ class SettingsApp:
         morning_frame = ttk.Frame(tab)
         morning_frame.pack(fill=tk.X, pady=10)
         ttk.Label(morning_frame, text="上午提醒时间:", font=("Segoe UI", 11)).pack(side=tk.LEFT)
-        self.morning_var = tk.StringVar(value=self.config["timer"]["morning"])
+        self.morning_var = tk.StringVar(value=settings_loader.format_time(self.config["timer"]["morning"]))
         morning_entry = ttk.Entry(morning_frame, textvariable=self.morning_var, width=10)
         morning_entry.pack(side=tk.LEFT, padx=10)
         ttk.Label(morning_frame, text="格式: HH:MM (24小时制)").pack(side=tk.LEFT, padx=5)
@@ -269,7 +221,7 @@ class SettingsApp:
         afternoon_frame = ttk.Frame(tab)
         afternoon_frame.pack(fill=tk.X, pady=10)
         ttk.Label(afternoon_frame, text="下午提醒时间:", font=("Segoe UI", 11)).pack(side=tk.LEFT)
-        self.afternoon_var = tk.StringVar(value=self.config["timer"]["afternoon"])
+        self.afternoon_var = tk.StringVar(value=settings_loader.format_time(self.config["timer"]["afternoon"]))
         afternoon_entry = ttk.Entry(afternoon_frame, textvariable=self.afternoon_var, width=10)
         afternoon_entry.pack(side=tk.LEFT, padx=10)
         ttk.Label(afternoon_frame, text="格式: HH:MM (24小时制)").pack(side=tk.LEFT, padx=5)
@@ -358,18 +310,24 @@ class SettingsApp:
         header_frame.pack(fill=tk.X, pady=(0, 5))
         ttk.Label(header_frame, text="学生姓名", font=("Segoe UI", 10, "bold")).pack(side=tk.LEFT)
         
+        # 筛选框：只显示包含输入内容的名字
+        ttk.Label(header_frame, text="筛选:").pack(side=tk.LEFT, padx=(20, 5))
+        self.namelist_filter_var = tk.StringVar()
+        self.namelist_filter_var.trace_add('write', lambda *_: self.refresh_namelist())
+        ttk.Entry(header_frame, textvariable=self.namelist_filter_var, width=20).pack(side=tk.LEFT)
+        
         listbox_frame = ttk.Frame(list_frame)
         listbox_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.namelist_var = tk.StringVar(value=self.config["namelist"])
-        self.namelist_listbox = tk.Listbox(listbox_frame, listvariable=self.namelist_var,
-                                           font=("Segoe UI", 10), selectmode=tk.SINGLE,
-                                           height=15)
+        # 列表框不绑定 listvariable，增删移动时只修改受影响的行
+        self.namelist_listbox = tk.Listbox(listbox_frame, font=("Segoe UI", 10),
+                                           selectmode=tk.EXTENDED, height=15)
         self.namelist_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
         scrollbar = ttk.Scrollbar(listbox_frame, orient=tk.VERTICAL, command=self.namelist_listbox.yview)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.namelist_listbox.config(yscrollcommand=scrollbar.set)
+        self.refresh_namelist()
         
         # 操作按钮
         button_frame = ttk.Frame(list_frame)
@@ -393,9 +351,9 @@ class SettingsApp:
         stats_frame = ttk.Frame(tab)
         stats_frame.pack(fill=tk.X, pady=10)
         student_count = len(self.config["namelist"])
-        stats_label = ttk.Label(stats_frame, text=f"当前学生总数: {student_count} 人", 
-                               font=("Segoe UI", 10, "bold"))
-        stats_label.pack(anchor=tk.W)
+        self.stats_label = ttk.Label(stats_frame, text=f"当前学生总数: {student_count} 人", 
+                                     font=("Segoe UI", 10, "bold"))
+        self.stats_label.pack(anchor=tk.W)
     
     def create_project_tab(self, notebook):
         tab = ttk.Frame(notebook, padding=15)
@@ -451,14 +409,42 @@ class SettingsApp:
         ttk.Button(button_frame, text="取消", command=self.root.destroy).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="应用", command=self.apply_settings).pack(side=tk.RIGHT, padx=5)
     
+    def refresh_namelist(self):
+        """按筛选条件重新填充整个列表框（只在打开、筛选、重置时调用）"""
+        self.namelist_view = self.namelist.filter(self.namelist_filter_var.get())
+        names = self.namelist.names if self.namelist_view is None else \
+            [self.namelist.names[i] for i in self.namelist_view]
+        self.namelist_listbox.delete(0, tk.END)
+        if names:
+            self.namelist_listbox.insert(tk.END, *names)
+        self.update_stats()
+    
+    def selected_namelist_indices(self):
+        """列表框中选中的行对应的名单位置"""
+        rows = self.namelist_listbox.curselection()
+        if self.namelist_view is None:
+            return list(rows)
+        return [self.namelist_view[row] for row in rows]
+    
+    def append_names(self, names):
+        """追加若干名字（已存在的跳过），只在列表框末尾插入新行"""
+        added = self.namelist.extend(names)
+        if added:
+            if self.namelist_view is None:
+                self.namelist_listbox.insert(tk.END, *added)
+            else:
+                self.refresh_namelist()
+        self.update_stats()
+        return added
+    
     def add_namelist_item(self):
         self.show_namelist_dialog("添加学生")
     
     def edit_namelist_item(self):
-        selection = self.namelist_listbox.curselection()
+        selection = self.selected_namelist_indices()
         if selection:
             index = selection[0]
-            current_name = self.config["namelist"][index]
+            current_name = self.namelist.names[index]
             self.show_namelist_dialog("编辑学生", current_name, index)
         else:
             messagebox.showwarning("警告", "请先选择一个学生")
@@ -479,21 +465,26 @@ class SettingsApp:
         
         def confirm():
             new_item = entry_var.get().strip()
-            if new_item:
-                current_list = list(self.config["namelist"])
+            if not new_item:
+                messagebox.showwarning("警告", "学生姓名不能为空")
+                return
+            try:
                 if index is not None:
-                    # 编辑模式
-                    current_list[index] = new_item
+                    # 编辑模式：只替换这一行
+                    self.namelist.rename(index, new_item)
+                    row = index if self.namelist_view is None else self.namelist_view.index(index)
+                    self.namelist_listbox.delete(row)
+                    self.namelist_listbox.insert(row, new_item)
+                    self.namelist_listbox.select_set(row)
                 else:
                     # 添加模式
-                    current_list.append(new_item)
-                self.config["namelist"] = current_list
-                self.namelist_var.set(current_list)
-                # 更新统计信息
-                self.update_stats()
-                dialog.destroy()
-            else:
-                messagebox.showwarning("警告", "学生姓名不能为空")
+                    if new_item in self.namelist:
+                        raise ValueError(f"'{new_item}' 已在名单中")
+                    self.append_names([new_item])
+            except ValueError as e:
+                messagebox.showwarning("警告", str(e))
+                return
+            dialog.destroy()
         
         button_frame = ttk.Frame(dialog)
         button_frame.pack(pady=10)
@@ -504,66 +495,97 @@ class SettingsApp:
         dialog.bind('<Return>', lambda e: confirm())
     
     def remove_namelist_item(self):
-        selection = self.namelist_listbox.curselection()
+        selection = self.selected_namelist_indices()
         if selection:
-            index = selection[0]
-            current_list = list(self.config["namelist"])
-            student_name = current_list[index]
-            if messagebox.askyesno("确认", f"确定要删除学生 '{student_name}' 吗？"):
-                current_list.pop(index)
-                self.config["namelist"] = current_list
-                self.namelist_var.set(current_list)
-                self.update_stats()
+            if len(selection) == 1:
+                prompt = f"确定要删除学生 '{self.namelist.names[selection[0]]}' 吗？"
+            else:
+                prompt = f"确定要删除选中的 {len(selection)} 名学生吗？"
+            if messagebox.askyesno("确认", prompt):
+                rows = self.namelist_listbox.curselection()
+                self.namelist.remove(selection)
+                if self.namelist_view is None:
+                    # 从后往前删除，前面的行号不受影响
+                    for row in reversed(rows):
+                        self.namelist_listbox.delete(row)
+                    self.update_stats()
+                else:
+                    self.refresh_namelist()
         else:
             messagebox.showwarning("警告", "请先选择一个学生")
     
     def clear_namelist(self):
         if messagebox.askyesno("确认", "确定要清空整个学生名单吗？"):
-            self.config["namelist"] = []
-            self.namelist_var.set([])
+            self.namelist.reset([])
+            self.namelist_listbox.delete(0, tk.END)
             self.update_stats()
     
+    def move_namelist_item(self, offset):
+        """上移/下移选中的名字，只改动交换的两行"""
+        if self.namelist_view is not None:
+            messagebox.showwarning("警告", "请先清空筛选条件再调整顺序")
+            return
+        selection = self.selected_namelist_indices()
+        if not selection:
+            return
+        index = selection[0]
+        target = self.namelist.move(index, offset)
+        if target != index:
+            self.namelist_listbox.delete(index)
+            self.namelist_listbox.insert(target, self.namelist.names[target])
+            self.namelist_listbox.selection_clear(0, tk.END)
+            self.namelist_listbox.select_set(target)
+            self.namelist_listbox.see(target)
+    
     def move_namelist_item_up(self):
-        selection = self.namelist_listbox.curselection()
-        if selection and selection[0] > 0:
-            index = selection[0]
-            current_list = list(self.config["namelist"])
-            current_list[index], current_list[index-1] = current_list[index-1], current_list[index]
-            self.config["namelist"] = current_list
-            self.namelist_var.set(current_list)
-            self.namelist_listbox.select_set(index-1)
+        self.move_namelist_item(-1)
     
     def move_namelist_item_down(self):
-        selection = self.namelist_listbox.curselection()
-        if selection and selection[0] < len(self.config["namelist"]) - 1:
-            index = selection[0]
-            current_list = list(self.config["namelist"])
-            current_list[index], current_list[index+1] = current_list[index+1], current_list[index]
-            self.config["namelist"] = current_list
-            self.namelist_var.set(current_list)
-            self.namelist_listbox.select_set(index+1)
+        self.move_namelist_item(1)
         
     def export_namelist(self):
-        # 简化的导出功能 - 实际应用中可以实现文件保存
-        names = "\n".join(self.config["namelist"])
-        messagebox.showinfo("学生名单", f"当前学生名单:\n\n{names}")
+        """把当前编辑中的名单导出为 CSV/TXT/JSON 文件，可附带连续出勤天数与分数"""
+        file_path = filedialog.asksaveasfilename(
+            title="导出名单",
+            defaultextension=".csv",
+            filetypes=[
+                ("CSV文件", "*.csv"),
+                ("文本文件", "*.txt"),
+                ("JSON文件", "*.json")
+            ]
+        )
+        if not file_path:
+            return  # 用户取消了选择
+        
+        try:
+            with_stats = messagebox.askyesno("导出名单", "是否同时导出每位学生当前的连续出勤天数和本阶段分数？")
+            if with_stats:
+                # 考勤数据位于设置文件所在项目目录的 eggs/ 中
+                from attendance import AttendanceSystem
+                system = AttendanceSystem(self.config_path.parent.parent, read_only=True)
+                rows = system.iter_member_stats(self.namelist.names)
+            else:
+                rows = ({'name': name} for name in self.namelist.names)
+            count = roster.export_names(file_path, rows, with_stats=with_stats)
+            messagebox.showinfo("成功", f"已导出 {count} 名学生到:\n{file_path}")
+        except Exception as e:
+            messagebox.showerror("错误", f"导出名单失败:\n{str(e)}")
     
     def update_stats(self):
         """更新统计信息"""
-        student_count = len(self.config["namelist"])
-        # 这里可以添加更新统计标签的代码
+        student_count = len(self.namelist)
+        if hasattr(self, 'stats_label'):
+            self.stats_label.config(text=f"当前学生总数: {student_count} 人")
     
     def validate_time_format(self, time_str):
         """验证时间格式"""
+        if ':' not in time_str:
+            return False
         try:
-            parts = time_str.split(':')
-            if len(parts) != 2:
-                return False
-            hour = int(parts[0])
-            minute = int(parts[1])
-            return 0 <= hour <= 23 and 0 <= minute <= 59
+            settings_loader.parse_time(time_str)
         except ValueError:
             return False
+        return True
     
     def save_settings(self):
         """保存所有设置"""
@@ -636,8 +658,8 @@ class SettingsApp:
         self.column_num_var.set(self.config["display"]["md"]["column_num"])
         self.theme_var.set(self.config["display"].get("theme", "light"))
         
-        self.namelist_var.set(self.config["namelist"])
-        self.update_stats()
+        self.use_namelist()
+        self.refresh_namelist()
     
     def run(self):
         self.root.mainloop()
@@ -0,0 +1,258 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""bacon/Setting.yml 的读取（main.py、settings.py 与命令行共用）
+
+解析后的设置以 JSON 缓存在 YAML 旁边（Setting.cache.json），并记录 YAML 的
+mtime、大小与 sha256：
+    - mtime 与大小都没变，直接读缓存，不读 YAML；
+    - mtime 变了但内容的 sha256 没变（例如文件被复制、touch），也复用缓存；
+    - 否则用 PyYAML 重新解析并更新缓存。
+同一进程内再次读取未变化的文件时，连缓存文件也不读。
+
+Settings 在加载时校验一次全部设置项并解析好定时、分数与字体；DEFAULTS 为各项的默认值。
+"""
+import copy
+import json
+import hashlib
+import datetime
+from pathlib import Path
+
+import storage
+
+CACHE_VERSION = 1
+ENCODINGS = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
+
+# 进程内缓存：YAML 路径 -> (mtime_ns, 大小, 设置)
+_MEMO = {}
+
+def cache_path(settings_file):
+    """设置缓存文件的路径"""
+    settings_file = Path(settings_file)
+    return settings_file.with_name(settings_file.stem + '.cache.json')
+
+def parse_yaml(raw):
+    """用 PyYAML 解析设置文件内容（bytes），依次尝试不同的编码"""
+    import yaml
+    for encoding in ENCODINGS:
+        try:
+            return yaml.safe_load(raw.decode(encoding))
+        except (UnicodeDecodeError, yaml.YAMLError):
+            continue
+
+    # 如果所有编码都失败，使用错误处理方式读取
+    return yaml.safe_load(raw.decode('utf-8', errors='replace'))
+
+def normalize(setting):
+    """校验并整理解析结果：顶层必须是映射，名单中的名字统一为字符串"""
+    if setting is None:
+        setting = {}
+    if not isinstance(setting, dict):
+        raise ValueError(f"设置文件的顶层应为映射，实际为 {type(setting).__name__}")
+    namelist = setting.get('namelist')
+    if isinstance(namelist, list):
+        setting['namelist'] = [str(name) for name in namelist if name is not None]
+    return setting
+
+def _read_cache(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+        return None
+    return cache
+
+def _write_cache(path, stat, digest, setting):
+    """写入缓存；设置中有 JSON 无法原样保存的值（如日期）时不缓存"""
+    try:
+        text = json.dumps(setting, ensure_ascii=False)
+        if json.loads(text) != setting:
+            return
+        storage.write_text(path, json.dumps({
+            'version': CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'settings': setting,
+        }, ensure_ascii=False))
+    except (TypeError, ValueError, OSError):
+        pass  # 缓存只是加速，写不了就下次再解析
+
+def load(settings_file):
+    """读取设置，返回 dict（每次返回新的副本，调用方可以随意修改）
+
+    文件不存在时抛出 FileNotFoundError，由调用方决定如何创建默认设置。
+    """
+    settings_file = Path(settings_file)
+    stat = settings_file.stat()
+    key = str(settings_file.resolve())
+    memo = _MEMO.get(key)
+    if memo is not None and memo[:2] == (stat.st_mtime_ns, stat.st_size):
+        return copy.deepcopy(memo[2])
+
+    path = cache_path(settings_file)
+    cache = _read_cache(path)
+    if cache is not None and (cache['mtime_ns'], cache['size']) == (stat.st_mtime_ns, stat.st_size):
+        setting = cache['settings']
+    else:
+        raw = settings_file.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+        if cache is not None and cache['sha256'] == digest:
+            setting = cache['settings']
+        else:
+            setting = normalize(parse_yaml(raw))
+        _write_cache(path, stat, digest, setting)
+
+    _MEMO[key] = (stat.st_mtime_ns, stat.st_size, setting)
+    return copy.deepcopy(setting)
+
+# 全部设置项的默认值（main.py、settings.py 与命令行共用）
+DEFAULTS = {
+    'points': {'_3_days': 1, '_7_days': 2.5},
+    'timer': {'on': True, 'morning': '7:05', 'afternoon': '14:05'},
+    'display': {
+        'win': {
+            'row_num': 7,
+            'font': 'Microsoft YaHei UI',
+            'font_size': 10,
+            'pronoun': '同学'
+        },
+        'md': {'column_num': 12, 'sort': 'atz', 'top': 0},
+        'theme': 'light'
+    },
+    'report': {'formats': ['md']},
+    'storage': {'backend': 'json', 'compact_every': 100, 'backups': 1},
+    'namelist': ['sexy', 'sleepy', 'stupid', 'sweet'],
+    'project': {
+        'url': 'https://github.com/Jack-tendy-538/scoring-early-bird-new',
+        'license': 'MIT License',
+        'version': '1.0.0.3'
+    }
+}
+
+SESSIONS = ('morning', 'afternoon')
+THEMES = ('light', 'dark')
+MD_SORTS = ('atz', 'zta', 'score+', 'score-')
+BACKENDS = ('json', 'sqlite', 'eventlog')
+REPORT_FORMATS = ('md', 'csv', 'tsv', 'jsonl')
+
+def with_defaults(setting, defaults=DEFAULTS):
+    """递归补全缺失的设置项，返回新的字典（不修改参数）"""
+    result = copy.deepcopy(defaults)
+    for key, value in (setting or {}).items():
+        if isinstance(result.get(key), dict) and isinstance(value, dict):
+            result[key] = with_defaults(value, result[key])
+        else:
+            result[key] = value
+    return result
+
+def parse_time(value):
+    """把定时设置解析为 datetime.time
+
+    接受 'H:MM' 字符串；未加引号的 7:05 会被 YAML 1.1 读成六十进制整数 425，也按分钟数处理。
+    格式不正确时抛出 ValueError。
+    """
+    if isinstance(value, datetime.time):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        hour, minute = divmod(value, 60)
+    else:
+        try:
+            hour, minute = (int(part) for part in str(value).strip().split(':'))
+        except ValueError:
+            raise ValueError(f"时间格式不正确: {value!r}，应为 HH:MM") from None
+    return datetime.time(hour, minute)
+
+def format_time(value):
+    """把定时设置显示为 'H:MM'；无法解析时原样转为字符串"""
+    try:
+        value = parse_time(value)
+    except ValueError:
+        return str(value)
+    return f"{value.hour}:{value.minute:02d}"
+
+def _int(value, default, minimum):
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return default
+    return value if value >= minimum else default
+
+def _number(value, default):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+class Settings:
+    """加载时校验一次的设置，之后各处直接读属性，不再层层 .get 和解析字符串
+
+    无效的值按 DEFAULTS 处理；raw 为原始字典（供报告导出等需要完整设置的地方使用）。
+    """
+
+    __slots__ = ('raw', 'namelist', 'points', 'points_3', 'points_7', 'timer_on', 'timers',
+                 'row_num', 'font', 'pronoun', 'theme', 'md_sort', 'md_top', 'report_formats',
+                 'max_days', 'backend', 'backups', 'compact_every')
+
+    def __init__(self, raw):
+        self.raw = raw
+        merged = with_defaults(raw)
+
+        namelist = raw.get('namelist')
+        self.namelist = list(namelist) if isinstance(namelist, list) else []
+
+        points = merged['points'] if isinstance(merged['points'], dict) else DEFAULTS['points']
+        self.points_3 = _number(points.get('_3_days'), DEFAULTS['points']['_3_days'])
+        self.points_7 = _number(points.get('_7_days'), DEFAULTS['points']['_7_days'])
+        self.points = {'_3_days': self.points_3, '_7_days': self.points_7}
+
+        timer = merged['timer'] if isinstance(merged['timer'], dict) else DEFAULTS['timer']
+        self.timer_on = bool(timer.get('on', True))
+        self.timers = {}
+        for session in SESSIONS:
+            try:
+                self.timers[session] = parse_time(timer.get(session))
+            except ValueError:
+                self.timers[session] = parse_time(DEFAULTS['timer'][session])
+
+        # 支持两种 display 配置位置：display.win.* 或 display.*（向后兼容）
+        display = raw.get('display') if isinstance(raw.get('display'), dict) else {}
+        win = display.get('win') if isinstance(display.get('win'), dict) else {}
+        win_defaults = DEFAULTS['display']['win']
+        self.row_num = _int(win.get('row_num', display.get('columns_per_row')), win_defaults['row_num'], 1)
+        self.font = (str(win.get('font') or display.get('font') or win_defaults['font']),
+                     _int(win.get('font_size') or display.get('font_size'), win_defaults['font_size'], 1))
+        self.pronoun = str(win.get('pronoun') or win_defaults['pronoun'])
+        theme = display.get('theme')
+        self.theme = theme if theme in THEMES else DEFAULTS['display']['theme']
+
+        display_merged = merged['display'] if isinstance(merged['display'], dict) else DEFAULTS['display']
+        md = display_merged['md'] if isinstance(display_merged.get('md'), dict) else {}
+        self.md_sort = md.get('sort') if md.get('sort') in MD_SORTS else 'atz'
+        self.md_top = _int(md.get('top'), 0, 0)
+
+        report = merged['report'] if isinstance(merged['report'], dict) else {}
+        formats = report.get('formats')
+        formats = formats if isinstance(formats, list) else []
+        # 不支持的格式忽略，一个都不剩时按 md 处理
+        self.report_formats = list(dict.fromkeys(
+            fmt for fmt in formats if isinstance(fmt, str) and fmt in REPORT_FORMATS)) or ['md']
+
+        self.max_days = _int(raw.get('max_days'), 7, 1)
+        storage_cfg = merged['storage'] if isinstance(merged['storage'], dict) else {}
+        backend = storage_cfg.get('backend')
+        self.backend = backend if backend in BACKENDS else 'json'
+        self.backups = _int(storage_cfg.get('backups'), 1, 0)
+        self.compact_every = _int(storage_cfg.get('compact_every'), 100, 1)
+
+    def score(self, awards):
+        """(3天奖励次数, 7天奖励次数) 对应的分数"""
+        _3_day, _7_day = awards
+        return _3_day * self.points_3 + _7_day * self.points_7
+
+    def timer_for(self, session):
+        """session 的自动提交时间（datetime.time）"""
+        return self.timers[session]
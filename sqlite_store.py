@@ -0,0 +1,127 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""可选的 SQLite 存储后端（storage.backend: sqlite）
+
+每个成员每个时段每天一行，记录一天只需插入 O(成员数) 行，不必重写整个文件。
+members 表为每个成员保存一份“基准状态”（ContinuousScoring.to_dict 的结果）及其对应的天数，
+加载时在基准状态上重放之后的各天即可；重置时只更新基准状态，历史行保留以便按日期查询。
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS attendance (
+    session TEXT NOT NULL,
+    member  TEXT NOT NULL,
+    day     INTEGER NOT NULL,
+    date    TEXT,
+    present INTEGER NOT NULL,
+    PRIMARY KEY (session, member, day)
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_member ON attendance(member);
+CREATE INDEX IF NOT EXISTS idx_attendance_date ON attendance(date);
+CREATE TABLE IF NOT EXISTS members (
+    session  TEXT NOT NULL,
+    member   TEXT NOT NULL,
+    seq      INTEGER NOT NULL,
+    base     TEXT NOT NULL,
+    base_day INTEGER NOT NULL,
+    PRIMARY KEY (session, member)
+);
+'''
+
+class AttendanceDB:
+    """attendance.db 的简单封装，只处理原始行，不依赖评分逻辑"""
+
+    def __init__(self, path, read_only=False):
+        """read_only 时以只读方式打开已有的数据库，不建表"""
+        self.path = Path(path)
+        if read_only:
+            self.conn = sqlite3.connect(self.path.resolve().as_uri() + '?mode=ro', uri=True)
+        else:
+            self.conn = sqlite3.connect(str(self.path))
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def has_session(self, session):
+        row = self.conn.execute(
+            'SELECT 1 FROM members WHERE session = ? LIMIT 1', (session,)).fetchone()
+        return row is not None
+
+    def last_day(self, session):
+        """该时段已记录的最大天序号，没有记录时为 0"""
+        row = self.conn.execute(
+            'SELECT MAX(day) FROM attendance WHERE session = ?', (session,)).fetchone()
+        return row[0] or 0
+
+    def members(self, session):
+        """按名单顺序返回 [(member, base字典, base_day), ...]"""
+        rows = self.conn.execute(
+            'SELECT member, base, base_day FROM members WHERE session = ? ORDER BY seq',
+            (session,))
+        return [(member, json.loads(base), base_day) for member, base, base_day in rows]
+
+    def days_after_base(self, session):
+        """返回 {member: [present, ...]}，只包含各成员基准状态之后的天，按天排序"""
+        rows = self.conn.execute(
+            '''SELECT a.member, a.present FROM attendance a
+               JOIN members m ON m.session = a.session AND m.member = a.member
+               WHERE a.session = ? AND a.day > m.base_day
+               ORDER BY a.member, a.day''', (session,))
+        days = {}
+        for member, present in rows:
+            days.setdefault(member, []).append(bool(present))
+        return days
+
+    def set_bases(self, session, states, base_day=None):
+        """用新的基准状态替换该时段的全部成员，states 为 [(member, 字典), ...]"""
+        if base_day is None:
+            base_day = self.last_day(session)
+        with self.conn:
+            self.conn.execute('DELETE FROM members WHERE session = ?', (session,))
+            self.conn.executemany(
+                'INSERT INTO members (session, member, seq, base, base_day) VALUES (?, ?, ?, ?, ?)',
+                ((session, member, seq, json.dumps(state, ensure_ascii=False), base_day)
+                 for seq, (member, state) in enumerate(states)))
+
+    def record_days(self, session, days):
+        """追加若干天的记录，days 为 [(date, [(member, present), ...]), ...]，返回最后一天的序号"""
+        day = self.last_day(session)
+        with self.conn:
+            for date, presence in days:
+                day += 1
+                self.conn.executemany(
+                    'INSERT INTO attendance (session, member, day, date, present) VALUES (?, ?, ?, ?, ?)',
+                    ((session, member, day, date, int(bool(present))) for member, present in presence))
+        return day
+
+    def count_present(self, session, start_date=None, end_date=None):
+        """按日期范围（含两端，ISO 格式字符串）统计每个成员的出勤天数"""
+        sql = 'SELECT member, SUM(present) FROM attendance WHERE session = ?'
+        params = [session]
+        if start_date is not None:
+            sql += ' AND date >= ?'
+            params.append(start_date)
+        if end_date is not None:
+            sql += ' AND date <= ?'
+            params.append(end_date)
+        sql += ' GROUP BY member'
+        return {member: count for member, count in self.conn.execute(sql, params)}
+
+    def import_session(self, session, members):
+        """从 JSON 数据文件一次性迁移
+
+        members 为 [(member, 状态字典, history列表), ...]。history 按末尾对齐写为行
+        （原始日期未知，记为 NULL），状态字典作为基准状态。
+        """
+        length = max((len(history) for _, _, history in members), default=0)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO attendance (session, member, day, date, present) VALUES (?, ?, ?, NULL, ?)',
+                ((session, member, length - len(history) + i + 1, int(bool(present)))
+                 for member, _, history in members
+                 for i, present in enumerate(history)))
+        self.set_bases(session, [(member, state) for member, state, _ in members], base_day=length)
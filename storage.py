@@ -0,0 +1,190 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""数据文件的持久化层
+
+所有 eggs/*.json 都经由这里读写：
+- 先写临时文件并 fsync，再用 os.replace 原子替换，进程中途被杀也不会留下半截文件；
+- 每个文件旁边保存一份 sha256 校验文件（xxx.json.sha256），读取时校验；
+- 可选滚动备份（xxx.json.bak1 为最近一次，数字越大越旧），主文件损坏时自动回退；
+- transaction() 内的多次写入会被暂存，正常退出时一起落盘，目录只 fsync 一次；出错时全部丢弃。
+"""
+import os
+import json
+import shutil
+import hashlib
+from pathlib import Path
+from contextlib import contextmanager
+
+class ChecksumError(ValueError):
+    """数据文件及其所有备份都无法通过校验"""
+
+_pending = []        # 事务中暂存的操作: (path, payload 或 None(删除), backups, 是否写校验文件)
+_depth = 0           # 事务嵌套层数
+
+def _checksum_path(path):
+    return path.with_name(path.name + '.sha256')
+
+def _backup_path(path, n):
+    return path.with_name(f'{path.name}.bak{n}')
+
+def _digest(payload):
+    return hashlib.sha256(payload).hexdigest()
+
+def _fsync_dir(directory):
+    """fsync 目录以保证 rename 落盘；Windows 不支持打开目录，直接跳过"""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_synced(path, payload):
+    with open(path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+def _replace_pair(src, dst):
+    """连同校验文件一起移动（校验文件缺失时删除目标的旧校验文件）"""
+    os.replace(src, dst)
+    src_sum, dst_sum = _checksum_path(src), _checksum_path(dst)
+    if src_sum.exists():
+        os.replace(src_sum, dst_sum)
+    elif dst_sum.exists():
+        dst_sum.unlink()
+
+def _rotate_backups(path, backups):
+    """bak{n-1} -> bak{n} ... 当前文件 -> bak1
+
+    当前文件用硬链接（不支持时复制）保留为 bak1，替换过程中主文件始终存在。
+    """
+    if backups <= 0 or not path.exists():
+        return
+    for n in range(backups, 1, -1):
+        older = _backup_path(path, n - 1)
+        if older.exists():
+            _replace_pair(older, _backup_path(path, n))
+    latest = _backup_path(path, 1)
+    for p in (latest, _checksum_path(latest)):
+        if p.exists():
+            p.unlink()
+    try:
+        os.link(path, latest)
+    except OSError:
+        shutil.copy2(path, latest)
+    if _checksum_path(path).exists():
+        shutil.copy2(_checksum_path(path), _checksum_path(latest))
+
+def _commit(ops):
+    """把暂存的操作落盘：先写好并 fsync 所有临时文件，再依次替换"""
+    staged = []
+    for path, payload, backups, checksum in ops:
+        if payload is None:
+            staged.append((path, None, None, backups))
+            continue
+        tmp = path.with_name(path.name + '.tmp')
+        _write_synced(tmp, payload)
+        tmp_sum = None
+        if checksum:
+            tmp_sum = _checksum_path(tmp)
+            _write_synced(tmp_sum, _digest(payload).encode('ascii'))
+        staged.append((path, tmp, tmp_sum, backups))
+
+    directories = set()
+    for path, tmp, tmp_sum, backups in staged:
+        directories.add(path.parent)
+        if tmp is None:
+            for p in (path, _checksum_path(path)):
+                if p.exists():
+                    p.unlink()
+            continue
+        _rotate_backups(path, backups)
+        os.replace(tmp, path)
+        if tmp_sum is not None:
+            os.replace(tmp_sum, _checksum_path(path))
+        elif _checksum_path(path).exists():
+            _checksum_path(path).unlink()
+
+    for directory in sorted(directories):
+        _fsync_dir(directory)
+
+def _submit(path, payload, backups, checksum=True):
+    op = (path, payload, backups, checksum)
+    if _depth:
+        # 同一事务中对同一文件的多次写入只保留最后一次
+        _pending[:] = [pending for pending in _pending if pending[0] != path]
+        _pending.append(op)
+    else:
+        _commit([op])
+
+@contextmanager
+def transaction():
+    """把一次逻辑操作中的所有写入合并为一次落盘
+
+    只有正常退出最外层时才落盘；任何一层抛出异常时丢弃整个事务中暂存的写入。
+    """
+    global _depth
+    _depth += 1
+    try:
+        yield
+    except BaseException:
+        _pending.clear()
+        raise
+    finally:
+        _depth -= 1
+    if _depth == 0 and _pending:
+        ops = list(_pending)
+        _pending.clear()
+        _commit(ops)
+
+def in_transaction():
+    return _depth > 0
+
+def write_json(path, data, backups=0, **dump_kwargs):
+    """原子地写入 JSON 文件，backups 为保留的滚动备份份数"""
+    path = Path(path)
+    dump_kwargs.setdefault('ensure_ascii', False)
+    payload = json.dumps(data, **dump_kwargs).encode('utf-8')
+    _submit(path, payload, backups)
+
+def write_text(path, text):
+    """原子地写入文本文件（不写校验文件，供之后还会被追加的文件使用）"""
+    _submit(Path(path), text.encode('utf-8'), 0, checksum=False)
+
+def remove(path):
+    """删除数据文件及其校验文件（备份保留）"""
+    _submit(Path(path), None, 0)
+
+def read_json(path, backups=0):
+    """读取并校验 JSON 文件；主文件损坏时依次尝试备份
+
+    没有校验文件的旧数据文件按原样读取。文件不存在时抛出 FileNotFoundError，
+    主文件和备份都损坏时抛出 ChecksumError。
+    """
+    path = Path(path)
+    candidates = [path] + [_backup_path(path, n) for n in range(1, backups + 1)]
+    found = False
+    for candidate in candidates:
+        if not candidate.exists():
+            continue
+        found = True
+        payload = candidate.read_bytes()
+        checksum_file = _checksum_path(candidate)
+        if checksum_file.exists():
+            digest = _digest(payload)
+            expected = checksum_file.read_text(encoding='ascii').strip()
+            # 在替换数据文件与校验文件之间中断时，新校验值仍留在 .tmp.sha256 中
+            pending_sum = _checksum_path(candidate.with_name(candidate.name + '.tmp'))
+            if expected != digest and not (
+                    pending_sum.exists()
+                    and pending_sum.read_text(encoding='ascii').strip() == digest):
+                continue
+        try:
+            return json.loads(payload.decode('utf-8'))
+        except ValueError:
+            continue
+    if not found:
+        raise FileNotFoundError(str(path))
+    raise ChecksumError(f'{path} 及其备份均已损坏')
@@ -0,0 +1,7 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+import sys
+from pathlib import Path
+
+# 各模块平铺在仓库根目录，测试直接导入
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
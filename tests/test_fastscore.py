@@ -0,0 +1,34 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""NumPy 批量计分与逐人计分（ContinuousScoring.calculate_scores）对比"""
+import pytest
+
+pytest.importorskip('numpy')
+hypothesis = pytest.importorskip('hypothesis')
+from hypothesis import given, strategies as st
+
+import fastscore
+from attendance import ContinuousScoring
+from test_scoring import old_scores
+
+def scalar_scores(histories):
+    return [ContinuousScoring.from_dict({'history': h}).calculate_scores() for h in histories]
+
+def batch_scores(histories):
+    threes, sevens = fastscore.score_histories(histories)
+    return [(int(a), int(b)) for a, b in zip(threes, sevens)]
+
+# 长短不一的记录（含空记录）
+@given(st.lists(st.lists(st.booleans(), max_size=40), max_size=12))
+def test_matches_scalar_path(histories):
+    assert batch_scores(histories) == scalar_scores(histories)
+    assert batch_scores(histories) == [old_scores(h) for h in histories]
+
+def test_empty_inputs():
+    assert batch_scores([]) == []
+    assert batch_scores([[]]) == [(0, 0)]
+    assert batch_scores([[], [True] * 10, []]) == [(0, 0), (1, 1), (0, 0)]
+
+def test_ragged_histories():
+    histories = [[True] * 3, [False, True, True, True, True, True, True, True], [True, False] * 5]
+    assert batch_scores(histories) == scalar_scores(histories) == [(1, 0), (0, 1), (0, 0)]
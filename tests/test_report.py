@@ -0,0 +1,30 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""报告导出：Markdown 的排序/前几名设置不影响其他格式"""
+import csv
+import json
+from datetime import datetime
+
+import pytest
+
+import report
+
+def make_table():
+    rows = [{'index': i, 'name': name, 'morning_total': score, 'afternoon_total': 0, 'total_score': score}
+            for i, (name, score) in enumerate([('a', 1), ('b', 3), ('c', 2)])]
+    return report.ScoreTable(rows, {'_3_days': 1, '_7_days': 2.5}, 7, datetime(2025, 9, 1))
+
+def test_md_top_only_affects_markdown(tmp_path):
+    files = report.write_reports(make_table(), tmp_path, 'r', ['md', 'csv', 'jsonl'], 'score-', 1)
+    md = files['md'].read_text(encoding='utf-8')
+    assert '| b |' in md and '| a |' not in md
+    with open(files['csv'], encoding='utf-8-sig', newline='') as f:
+        assert [row['name'] for row in csv.DictReader(f)] == ['a', 'b', 'c']
+    with open(files['jsonl'], encoding='utf-8') as f:
+        assert [json.loads(line)['name'] for line in f] == ['a', 'b', 'c']
+
+@pytest.mark.parametrize('formats', [[], ['md', 'xlsx']])
+def test_invalid_formats_write_nothing(tmp_path, formats):
+    with pytest.raises(ValueError):
+        report.write_reports(make_table(), tmp_path, 'r', formats)
+    assert list(tmp_path.iterdir()) == []
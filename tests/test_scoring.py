@@ -0,0 +1,79 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""增量计分与原来逐次重建连续段的算法对比（随机出勤记录）"""
+import pytest
+
+hypothesis = pytest.importorskip('hypothesis')
+from hypothesis import given, strategies as st
+
+from attendance import ContinuousScoring
+
+def old_scores(history):
+    """原来的 calculate_scores：重建连续段后逐个弹出，满7天的段扣掉7天放回队尾"""
+    scoring = [0]
+    for arrived in history:
+        if arrived:
+            scoring[-1] += 1
+        else:
+            scoring.append(0)
+    _3_day, _7_day = 0, 0
+    while scoring:
+        n = scoring.pop(0)
+        if n < 3:
+            continue
+        if 3 <= n < 7:
+            _3_day += 1
+            continue
+        _7_day += 1
+        scoring.append(n - 7)
+    return _3_day, _7_day
+
+def old_record(history, arrived, max_days):
+    """原来的 record_attendance 对 history 的处理：追加后只保留最近 max_days*2 天"""
+    history = history + [arrived]
+    if len(history) > max_days * 2:
+        history = history[-max_days * 2:]
+    return history
+
+histories = st.lists(st.booleans(), max_size=80)
+max_days = st.integers(min_value=1, max_value=12)
+
+@given(days=histories, max_days=max_days)
+def test_record_matches_old_algorithm(days, max_days):
+    student = ContinuousScoring(max_days=max_days)
+    history = []
+    for arrived in days:
+        student.record_attendance(arrived)
+        history = old_record(history, arrived, max_days)
+        # 每一步都要一致，覆盖 history 超过 max_days*2 后的截断
+        assert student.history == history
+        assert student.calculate_scores() == old_scores(history)
+
+@given(stored=histories, days=histories, max_days=max_days)
+def test_from_dict_untrimmed_history(stored, days, max_days):
+    # 旧数据文件中的 history 可能长于 max_days*2，加载后第一次记录时才截断
+    student = ContinuousScoring.from_dict({'history': stored, 'max_days': max_days})
+    assert student.calculate_scores() == old_scores(stored)
+
+    history = list(stored)
+    for arrived in days:
+        student.record_attendance(arrived)
+        history = old_record(history, arrived, max_days)
+        assert student.calculate_scores() == old_scores(history)
+
+@given(days=histories, max_days=max_days)
+def test_round_trip(days, max_days):
+    student = ContinuousScoring(max_days=max_days)
+    for arrived in days:
+        student.record_attendance(arrived)
+    restored = ContinuousScoring.from_dict(student.to_dict())
+    assert restored.history == student.history
+    assert restored.calculate_scores() == student.calculate_scores()
+
+def test_long_streak():
+    # 连续 10 天：一次7天奖励，剩下的 3 天再得一次3天奖励
+    assert old_scores([True] * 10) == (1, 1)
+    student = ContinuousScoring(max_days=7)
+    for _ in range(10):
+        student.record_attendance(True)
+    assert student.calculate_scores() == (1, 1)
@@ -0,0 +1,34 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""设置的加载、校验与热更新"""
+import datetime
+
+import yaml
+
+import settings_loader
+from attendance import AttendanceSystem
+
+def write_setting(root, setting):
+    (root / 'bacon').mkdir(exist_ok=True)
+    with open(root / 'bacon' / 'Setting.yml', 'w', encoding='utf-8') as f:
+        yaml.dump(setting, f, allow_unicode=True)
+
+def test_reload_ignores_half_written_file(tmp_path):
+    write_setting(tmp_path, {'namelist': ['a', 'b']})
+    system = AttendanceSystem(tmp_path)
+    # 设置程序写入途中：文件已被清空
+    (tmp_path / 'bacon' / 'Setting.yml').write_text('', encoding='utf-8')
+    assert not system.reload_settings()
+    assert system.settings.namelist == ['a', 'b']
+
+    write_setting(tmp_path, {'namelist': ['a', 'b', 'newkid']})
+    assert system.reload_settings()
+    assert system.settings.namelist == ['a', 'b', 'newkid']
+
+def test_settings_defaults_and_times():
+    settings = settings_loader.Settings({'timer': {'morning': 425, 'afternoon': 'bad'},
+                                         'report': {'formats': ['xlsx', 'csv']}})
+    assert settings.timer_for('morning') == datetime.time(7, 5)
+    assert settings.timer_for('afternoon') == datetime.time(14, 5)
+    assert settings.report_formats == ['csv']
+    assert settings.score((2, 1)) == 2 * 1 + 1 * 2.5
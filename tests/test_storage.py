@@ -0,0 +1,62 @@
+# licensed under the MIT License.
+# partly using AI code generation, but mostly hand-coded.
+"""各存储后端在“重启”（新建 AttendanceSystem）之后能否完整读回数据"""
+import json
+
+import pytest
+import yaml
+
+import storage
+from attendance import AttendanceSystem
+
+BACKENDS = ['json', 'sqlite', 'eventlog']
+
+def make_root(tmp_path, backend, **storage_cfg):
+    (tmp_path / 'bacon').mkdir()
+    setting = {'namelist': ['a', 'b'], 'storage': {'backend': backend, **storage_cfg}}
+    with open(tmp_path / 'bacon' / 'Setting.yml', 'w', encoding='utf-8') as f:
+        yaml.dump(setting, f)
+    return tmp_path
+
+def histories(root, session='morning'):
+    students = AttendanceSystem(root).load_student_data(session)
+    return {name: student.history for name, student in students.items()}
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_restart_between_records(tmp_path, backend):
+    root = make_root(tmp_path, backend, compact_every=2)
+    # 每次记录都在新的 AttendanceSystem 中进行，相当于每天重新打开程序
+    for present in (['a'], ['a', 'b'], ['a'], [], ['b']):
+        AttendanceSystem(root).record_attendance('morning', present)
+    assert histories(root) == {'a': [True, True, True, False, False],
+                               'b': [False, True, False, False, True]}
+
+def test_eventlog_seq_survives_compaction(tmp_path):
+    root = make_root(tmp_path, 'eventlog', compact_every=2)
+    for _ in range(3):
+        AttendanceSystem(root).record_attendance('morning', ['a'])
+    assert histories(root)['a'] == [True, True, True]
+    # 压缩后日志中的事件编号仍然接在快照之后
+    snapshot = json.loads((root / 'eggs' / 'morning_snapshot.json').read_text(encoding='utf-8'))
+    system = AttendanceSystem(root)
+    assert system.log.seq >= snapshot['seq']
+
+def test_eventlog_torn_tail(tmp_path):
+    root = make_root(tmp_path, 'eventlog')
+    AttendanceSystem(root).record_attendance('morning', ['a'], '2025-09-01')
+    log = root / 'eggs' / 'events.log'
+    log.write_bytes(log.read_bytes() + b'{"seq": 2, "date": "2025-09-0')
+    AttendanceSystem(root).record_attendance('morning', ['b'], '2025-09-02')
+    assert histories(root) == {'a': [True, False], 'b': [False, True]}
+
+@pytest.mark.parametrize('backend', ['json', 'eventlog'])
+def test_failed_batch_is_not_persisted(tmp_path, backend):
+    root = make_root(tmp_path, backend)
+    system = AttendanceSystem(root)
+    system.record_attendance('morning', ['a'])
+    with pytest.raises(KeyError):
+        with system.batch():
+            system.reset_all_data()
+            raise KeyError
+    assert not storage.in_transaction()
+    assert histories(root)['a'] == [True]